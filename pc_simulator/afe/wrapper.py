@@ -9,6 +9,7 @@ This module simulates MC33774 AFE measurement characteristics:
 - Fault scheduling (time-based)
 """
 
+import math
 import numpy as np
 from typing import Tuple, Optional, Dict, List, Union
 from enum import Enum
@@ -66,6 +67,10 @@ class AFEWrapper:
     
     NUM_CELLS = 16
     
+    # Per-channel bit values (1 << i), used to expand the uint16 fault masks
+    _CELL_BITS = np.left_shift(1, np.arange(NUM_CELLS, dtype=np.int64))
+    _NTC_BITS = _CELL_BITS << 16  # NTC fault flags sit in bits 16-31
+    
     def __init__(
         self,
         noise_config: Optional[Dict] = None,
@@ -97,6 +102,12 @@ class AFEWrapper:
         self._voltage_noise_mv = self._noise_config.get('voltage_noise_mv', self.DEFAULT_VOLTAGE_NOISE_MV)
         self._temp_noise_c = self._noise_config.get('temp_noise_c', self.DEFAULT_TEMP_NOISE_C)
         self._current_noise_ma = self._noise_config.get('current_noise_ma', self.DEFAULT_CURRENT_NOISE_MA)
+        # Per-draw noise std devs: one per voltage channel, temperature channel, current
+        self._noise_sigma = np.concatenate((
+            np.full(self.NUM_CELLS, self._voltage_noise_mv, dtype=np.float64),
+            np.full(self.NUM_CELLS, self._temp_noise_c, dtype=np.float64),
+            [self._current_noise_ma]
+        ))
         
         # Calibration errors (per-channel)
         self._calibration_errors = calibration_errors or {}
@@ -106,25 +117,20 @@ class AFEWrapper:
         current_gain_error = self._calibration_errors.get('current_gain_error', self.DEFAULT_CURRENT_GAIN_ERROR)
         current_offset_ma = self._calibration_errors.get('current_offset_ma', self.DEFAULT_CURRENT_OFFSET_MA)
         
-        # Generate per-channel calibration errors
-        # Voltage: gain and offset per cell
-        self._voltage_gain_errors = np.random.uniform(
-            1.0 - voltage_gain_error,
-            1.0 + voltage_gain_error,
-            self.NUM_CELLS
-        )
-        self._voltage_offsets_mv = np.random.uniform(
-            -voltage_offset_mv,
-            voltage_offset_mv,
-            self.NUM_CELLS
+        # Generate per-channel calibration errors in one contiguous (3, 16)
+        # block, one row per parameter: voltage gain, voltage offset (mV) and
+        # temperature offset (°C). Rows are drawn in that order, as before.
+        self._channel_calibration = np.random.uniform(
+            [[1.0 - voltage_gain_error], [-voltage_offset_mv], [-temp_offset_c]],
+            [[1.0 + voltage_gain_error], [voltage_offset_mv], [temp_offset_c]],
+            (3, self.NUM_CELLS)
         )
+        # Voltage: gain and offset per cell (row views)
+        self._voltage_gain_errors = self._channel_calibration[0]
+        self._voltage_offsets_mv = self._channel_calibration[1]
         
-        # Temperature: offset per channel
-        self._temp_offsets_c = np.random.uniform(
-            -temp_offset_c,
-            temp_offset_c,
-            self.NUM_CELLS
-        )
+        # Temperature: offset per channel (row view)
+        self._temp_offsets_c = self._channel_calibration[2]
         
         # Current: gain and offset (single channel)
         self._current_gain_error = np.random.uniform(
@@ -146,6 +152,7 @@ class AFEWrapper:
         
         # Fault scheduling
         self._fault_schedule: List[Dict] = []  # List of scheduled faults
+        self._next_schedule_event_ms = math.inf  # Earliest pending inject/clear time
         self._start_time_ms = None  # Simulation start time
         
         # Status flags
@@ -165,8 +172,8 @@ class AFEWrapper:
         Apply AFE measurement processing to true values.
         
         Args:
-            true_voltages: True cell voltages in mV (array[16])
-            true_temps: True cell temperatures in °C (array[16])
+            true_voltages: True cell voltages in mV (array[16], any real dtype; not copied)
+            true_temps: True cell temperatures in °C (array[16], any real dtype; not copied)
             true_current: True pack current in mA
         
         Returns:
@@ -181,14 +188,23 @@ class AFEWrapper:
         # Update fault schedule
         self._update_fault_schedule()
         
-        # Process voltages
-        measured_voltages = self._process_voltages(true_voltages)
-        
-        # Process temperatures
-        measured_temps = self._process_temperatures(true_temps)
+        # Draw all Gaussian noise for this measurement in one call, in the
+        # order the channels used to draw it (voltages, temperatures, current),
+        # so the seeded stream is unchanged
+        noise = np.random.standard_normal(self._noise_sigma.size)
+        noise *= self._noise_sigma
+        num_cells = self.NUM_CELLS
+        
+        # Process voltages and temperatures as a single-frame batch
+        measured_voltages = self._process_voltages(
+            np.reshape(true_voltages, (1, num_cells)), noise[:num_cells]
+        )[0]
+        measured_temps = self._process_temperatures(
+            np.reshape(true_temps, (1, num_cells)), noise[num_cells:2 * num_cells]
+        )[0]
         
         # Process current
-        measured_current = self._process_current(true_current)
+        measured_current = self._process_current(true_current, float(noise[-1]))
         
         # Update status flags
         self._update_status_flags(measured_voltages, measured_temps, measured_current)
@@ -201,86 +217,158 @@ class AFEWrapper:
         
         return measured_voltages, measured_temps, measured_current, self._status_flags
     
-    def _process_voltages(self, true_voltages: np.ndarray) -> np.ndarray:
-        """Process cell voltages with quantization, noise, calibration, and faults."""
-        measured_voltages = true_voltages.copy()
+    def apply_measurement_batch(
+        self,
+        true_voltages: np.ndarray,
+        true_temps: np.ndarray,
+        true_currents: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Apply AFE measurement processing to N consecutive frames at once.
         
-        # Apply calibration errors (gain and offset)
-        measured_voltages = measured_voltages * self._voltage_gain_errors + self._voltage_offsets_mv
+        The fault schedule is evaluated once for the whole batch, and all
+        noise is drawn in one call before the CRC error draws. With CRC error
+        injection off this matches N calls to apply_measurement exactly;
+        otherwise it is statistically equivalent.
+        
+        Args:
+            true_voltages: True cell voltages in mV (array[N, 16], any real dtype)
+            true_temps: True cell temperatures in °C (array[N, 16], any real dtype)
+            true_currents: True pack currents in mA (array[N], any real dtype)
+        
+        Returns:
+            Tuple of (measured_voltages, measured_temps, measured_currents, status_flags)
+            - measured_voltages: array[N, 16] in mV (float)
+            - measured_temps: array[N, 16] in centi-°C (int16)
+            - measured_currents: array[N] in mA (float)
+            - status_flags: array[N] (uint32 bit flags)
+        """
+        # No dtype conversion here: the first ufunc of each channel computes
+        # into a fresh float64 output, so float32/uint16 inputs are read in
+        # place instead of being copied
+        true_voltages = np.asarray(true_voltages)
+        true_temps = np.asarray(true_temps)
+        true_currents = np.asarray(true_currents)
+        num_frames = true_currents.shape[0] if true_currents.ndim == 1 else 0
+        num_cells = self.NUM_CELLS
+        if (num_frames == 0 or true_voltages.shape != (num_frames, num_cells)
+                or true_temps.shape != (num_frames, num_cells)):
+            raise ValueError(
+                f"Expected voltages/temps of shape (N, {num_cells}) and currents of shape (N,) with N >= 1, "
+                f"got {true_voltages.shape}, {true_temps.shape}, {true_currents.shape}"
+            )
+        
+        self._measurement_count += num_frames
+        
+        # Update fault schedule
+        self._update_fault_schedule()
+        
+        # Draw all Gaussian noise in one call; each row holds one frame's
+        # draws in the order the channels used to draw them (voltages,
+        # temperatures, current), so the seeded stream is unchanged
+        noise = np.random.standard_normal((num_frames, self._noise_sigma.size))
+        noise *= self._noise_sigma
+        
+        # Process voltages
+        measured_voltages = self._process_voltages(true_voltages, noise[:, :num_cells])
+        
+        # Process temperatures
+        measured_temps = self._process_temperatures(true_temps, noise[:, num_cells:2 * num_cells])
+        
+        # Process current
+        measured_currents = self._process_currents(true_currents, noise[:, -1])
+        
+        # Status flags per frame
+        status_flags = self._compute_status_flags(measured_voltages, measured_temps, measured_currents)
         
-        # Apply Gaussian noise
-        noise = np.random.normal(0.0, self._voltage_noise_mv, self.NUM_CELLS)
+        # Apply CRC error (if enabled)
+        if self._crc_error_rate > 0.0:
+            crc_errors = np.random.random(num_frames) < self._crc_error_rate
+            self._crc_error_count += int(np.count_nonzero(crc_errors))
+            # CRC error doesn't modify data, but sets flag
+            status_flags[crc_errors] |= (1 << 31)  # Set CRC error bit
+        
+        self._status_flags = int(status_flags[-1])
+        
+        return measured_voltages, measured_temps, measured_currents, status_flags.astype(np.uint32)
+    
+    def _process_voltages(self, true_voltages: np.ndarray, noise: np.ndarray) -> np.ndarray:
+        """Process cell voltages (array[N, 16]) with quantization, noise, calibration, and faults."""
+        # Fused calibration (gain and offset): one fresh output array per call,
+        # every later stage works on it in place
+        measured_voltages = np.multiply(true_voltages, self._voltage_gain_errors, dtype=np.float64)
+        measured_voltages += self._voltage_offsets_mv
+        
+        # Apply Gaussian noise (pre-scaled by the caller)
         measured_voltages += noise
         
         # Apply fault injection
-        for i in range(self.NUM_CELLS):
-            cell_mask = 1 << i
-            
+        if self._open_wire_mask or self._stuck_adc_mask:
+            open_wire = (self._CELL_BITS & self._open_wire_mask) != 0
+            stuck = ((self._CELL_BITS & self._stuck_adc_mask) != 0) & ~open_wire
+            # Stuck ADC: latch the first value, then keep reporting the stored one
+            latched = stuck & (self._stuck_adc_values != 0.0)
+            measured_voltages[:, latched] = self._stuck_adc_values[latched]
+            latching = stuck & ~latched
+            measured_voltages[1:, latching] = measured_voltages[0, latching]
+            # Update stored value (for stuck ADC) on every channel not open-wire
+            tracking = ~open_wire
+            self._stuck_adc_values[tracking] = measured_voltages[-1, tracking]
             # Open wire fault
-            if self._open_wire_mask & cell_mask:
-                measured_voltages[i] = self.INVALID_VOLTAGE_MV
-            # Stuck ADC fault
-            elif self._stuck_adc_mask & cell_mask:
-                # Keep last valid value (don't update)
-                if self._stuck_adc_values[i] == 0.0:
-                    # First time, store current value
-                    self._stuck_adc_values[i] = measured_voltages[i]
-                else:
-                    # Use stored value
-                    measured_voltages[i] = self._stuck_adc_values[i]
-            else:
-                # Update stored value (for stuck ADC)
-                self._stuck_adc_values[i] = measured_voltages[i]
+            measured_voltages[:, open_wire] = self.INVALID_VOLTAGE_MV
+        else:
+            self._stuck_adc_values[:] = measured_voltages[-1]
         
         # Quantization (16-bit ADC, 0.1mV resolution)
-        measured_voltages = np.round(measured_voltages / self.VOLTAGE_RESOLUTION_MV) * self.VOLTAGE_RESOLUTION_MV
+        measured_voltages /= self.VOLTAGE_RESOLUTION_MV
+        np.rint(measured_voltages, out=measured_voltages)
+        measured_voltages *= self.VOLTAGE_RESOLUTION_MV
         
         # Clip to valid range (0-6553.5mV for 16-bit, but typical cell range is 2500-3650mV)
-        measured_voltages = np.clip(measured_voltages, 0.0, 6553.5)
+        # (maximum/minimum pair: cheaper than np.clip on frame-sized arrays)
+        np.maximum(measured_voltages, 0.0, out=measured_voltages)
+        np.minimum(measured_voltages, 6553.5, out=measured_voltages)
         
         return measured_voltages
     
-    def _process_temperatures(self, true_temps: np.ndarray) -> np.ndarray:
+    def _process_temperatures(self, true_temps: np.ndarray, noise: np.ndarray) -> np.ndarray:
         """
-        Process temperatures with quantization, noise, calibration, and faults.
+        Process temperatures (array[N, 16]) with quantization, noise, calibration, and faults.
         
         Returns:
             Array of temperatures in centi-°C (int16 format)
         """
-        measured_temps = true_temps.copy()
-        
         # Apply calibration errors (offset only)
-        measured_temps += self._temp_offsets_c
+        measured_temps = np.add(true_temps, self._temp_offsets_c, dtype=np.float64)
         
-        # Apply Gaussian noise
-        noise = np.random.normal(0.0, self._temp_noise_c, self.NUM_CELLS)
+        # Apply Gaussian noise (pre-scaled by the caller)
         measured_temps += noise
         
         # Apply fault injection
-        for i in range(self.NUM_CELLS):
-            cell_mask = 1 << i
-            
+        if self._ntc_fault_mask:
             # NTC fault (open or short)
-            if self._ntc_fault_mask & cell_mask:
-                measured_temps[i] = self.INVALID_TEMP_C / 100.0  # Convert to °C for processing
+            ntc_fault = (self._CELL_BITS & self._ntc_fault_mask) != 0
+            measured_temps[:, ntc_fault] = self.INVALID_TEMP_C / 100.0  # Convert to °C for processing
         
         # Quantization (12-bit ADC, 0.1°C resolution)
-        measured_temps = np.round(measured_temps / self.TEMPERATURE_RESOLUTION_C) * self.TEMPERATURE_RESOLUTION_C
+        measured_temps /= self.TEMPERATURE_RESOLUTION_C
+        np.rint(measured_temps, out=measured_temps)
+        measured_temps *= self.TEMPERATURE_RESOLUTION_C
         
         # Convert to centi-°C (int16 format: -32768 to 32767, representing -327.68°C to 327.67°C)
-        measured_temps_centi = (measured_temps * 100.0).astype(np.int16)
+        measured_temps *= 100.0
+        measured_temps_centi = measured_temps.astype(np.int16)
         
         return measured_temps_centi  # Return in centi-°C (int16)
     
-    def _process_current(self, true_current: float) -> float:
+    def _process_current(self, true_current: float, noise: float) -> float:
         """Process current with quantization, noise, calibration, and faults."""
         measured_current = true_current
         
         # Apply calibration errors (gain and offset)
         measured_current = measured_current * self._current_gain_error + self._current_offset_ma
         
-        # Apply Gaussian noise
-        noise = np.random.normal(0.0, self._current_noise_ma)
+        # Apply Gaussian noise (pre-scaled by the caller)
         measured_current += noise
         
         # Apply fault injection
@@ -292,6 +380,28 @@ class AFEWrapper:
         
         return measured_current
     
+    def _process_currents(self, true_currents: np.ndarray, noise: np.ndarray) -> np.ndarray:
+        """Process currents (array[N]) with quantization, noise, calibration, and faults."""
+        # Apply calibration errors (gain and offset)
+        measured_currents = np.multiply(true_currents, self._current_gain_error, dtype=np.float64)
+        measured_currents += self._current_offset_ma
+        
+        # Apply Gaussian noise (pre-scaled by the caller)
+        measured_currents += noise
+        
+        # Apply fault injection
+        if self._current_sensor_fault:
+            measured_currents.fill(self.INVALID_CURRENT_MA)
+        
+        # Quantization (16-bit ADC, 1mA resolution)
+        measured_currents /= self.CURRENT_RESOLUTION_MA
+        np.rint(measured_currents, out=measured_currents)
+        measured_currents *= self.CURRENT_RESOLUTION_MA
+        # Turn -0.0 into 0.0, as Python's round() did
+        measured_currents += 0.0
+        
+        return measured_currents
+    
     def _update_status_flags(self, voltages: np.ndarray, temps: np.ndarray, current: float):
         """Update status flags based on measurements."""
         self._status_flags = 0
@@ -305,16 +415,14 @@ class AFEWrapper:
         # NTC fault flags (we'll use a separate field or bits 16-31)
         # For simplicity, combine into status flags
         
-        # Check for invalid voltages (open wire detection)
-        for i in range(self.NUM_CELLS):
-            if voltages[i] == self.INVALID_VOLTAGE_MV:
-                self._status_flags |= (1 << i)  # Set open wire bit
+        # Check for invalid voltages (open wire detection); channel bits are
+        # distinct, so summing the selected bits ORs them together
+        self._status_flags |= int(self._CELL_BITS[voltages == self.INVALID_VOLTAGE_MV].sum())
         
         # Check for invalid temperatures (NTC fault)
         # temps are in centi-°C, so -32768 (0x8000) is invalid
-        for i in range(self.NUM_CELLS):
-            if temps[i] <= -32000:  # Invalid temperature threshold (centi-°C)
-                self._status_flags |= (1 << (16 + i))  # Set NTC fault bit
+        # Invalid temperature threshold (centi-°C) sets NTC fault bits 16+i
+        self._status_flags |= int(self._CELL_BITS[temps <= -32000].sum()) << 16
         
         # Current sensor fault (bit 30)
         if self._current_sensor_fault or current == self.INVALID_CURRENT_MA:
@@ -323,6 +431,24 @@ class AFEWrapper:
         # CRC error (bit 31)
         # Set in apply_measurement if CRC error injected
     
+    def _compute_status_flags(self, voltages: np.ndarray, temps: np.ndarray, currents: np.ndarray) -> np.ndarray:
+        """Compute status flags (int64 array[N]) for a batch of measurements (see _update_status_flags)."""
+        # Open wire detection (bits 0-15); channel bits are distinct, so the
+        # matrix product ORs together the bits of every invalid channel
+        status_flags = (voltages == self.INVALID_VOLTAGE_MV) @ self._CELL_BITS
+        status_flags |= self._open_wire_mask
+        
+        # NTC faults (bits 16-31, temps in centi-°C)
+        status_flags |= (temps <= -32000) @ self._NTC_BITS
+        
+        # Current sensor fault (bit 30)
+        if self._current_sensor_fault:
+            status_flags |= (1 << 30)
+        else:
+            status_flags[currents == self.INVALID_CURRENT_MA] |= (1 << 30)
+        
+        return status_flags
+    
     def _should_inject_crc_error(self) -> bool:
         """Check if CRC error should be injected (based on error rate)."""
         if self._crc_error_rate <= 0.0:
@@ -380,6 +506,7 @@ class AFEWrapper:
                 'cell_mask': cell_mask,
                 'clear_time_ms': clear_time
             })
+            self._next_schedule_event_ms = min(self._next_schedule_event_ms, clear_time)
     
     def clear_fault(
         self,
@@ -443,6 +570,7 @@ class AFEWrapper:
             'duration_ms': duration_ms,
             'injected': False
         })
+        self._next_schedule_event_ms = min(self._next_schedule_event_ms, inject_time_ms)
     
     def set_crc_error_rate(self, error_rate: float):
         """
@@ -467,7 +595,14 @@ class AFEWrapper:
     
     def _update_fault_schedule(self):
         """Update fault schedule (inject/clear faults based on time)."""
+        # Nothing scheduled: skip the clock read entirely
+        if self._next_schedule_event_ms == math.inf:
+            return
+        
+        # Nothing due yet: skip the scan
         current_time = self._get_current_time_ms()
+        if current_time < self._next_schedule_event_ms:
+            return
         
         # Process scheduled faults
         remaining_schedule = []
@@ -497,6 +632,17 @@ class AFEWrapper:
             remaining_schedule.append(fault_event)
         
         self._fault_schedule = remaining_schedule
+        self._next_schedule_event_ms = min(
+            (self._pending_event_time_ms(fault_event) for fault_event in remaining_schedule),
+            default=math.inf
+        )
+    
+    @staticmethod
+    def _pending_event_time_ms(fault_event: Dict) -> float:
+        """Time at which a schedule entry next needs processing (inf if never)."""
+        if 'inject_time_ms' in fault_event and not fault_event.get('injected', False):
+            return fault_event['inject_time_ms']
+        return fault_event.get('clear_time_ms', math.inf)
     
     def get_status_flags(self) -> int:
         """
@@ -535,6 +681,7 @@ class AFEWrapper:
         self._current_sensor_fault = False
         self._crc_error_rate = 0.0
         self._fault_schedule = []
+        self._next_schedule_event_ms = math.inf
         self._status_flags = 0
         self._measurement_count = 0
         self._crc_error_count = 0
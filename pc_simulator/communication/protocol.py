@@ -7,6 +7,7 @@ Binary UART protocol for SIL BMS communication:
 - CRC16-CCITT algorithm
 """
 
+import binascii
 import struct
 from typing import Tuple, Optional
 import numpy as np
@@ -37,19 +38,9 @@ def crc16_ccitt(data: bytes, initial: int = 0xFFFF) -> int:
     Returns:
         CRC16-CCITT value (uint16)
     """
-    polynomial = 0x1021
-    crc = initial
-    
-    for byte in data:
-        crc ^= (byte << 8)
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = (crc << 1) ^ polynomial
-            else:
-                crc <<= 1
-            crc &= 0xFFFF
-    
-    return crc
+    # binascii.crc_hqx implements this exact CRC (polynomial 0x1021,
+    # MSB-first, no reflection, no XOR out) in C
+    return binascii.crc_hqx(data, initial & 0xFFFF)
 
 
 class AFEMeasFrame:
@@ -68,6 +59,16 @@ class AFEMeasFrame:
     PAYLOAD_FORMAT = '<I' + 'H' * 16 + 'h' * 16 + 'iII'  # Little-endian
     PAYLOAD_SIZE = 4 + 16*2 + 16*2 + 4 + 4 + 4  # 80 bytes
     
+    # Frame pieces around the cell arrays (which are serialised by numpy):
+    # SOF | msg_id | len | seq | timestamp, then the payload scalars, then CRC16 | EOF
+    _HEADER_STRUCT = struct.Struct('<BBBHI')
+    _SCALARS_STRUCT = struct.Struct('<iII')
+    _TRAILER_STRUCT = struct.Struct('<HB')
+    _VCELL_OFFSET = _HEADER_STRUCT.size
+    _TCELL_OFFSET = _VCELL_OFFSET + 16 * 2
+    _SCALARS_OFFSET = _TCELL_OFFSET + 16 * 2
+    FRAME_SIZE = _SCALARS_OFFSET + _SCALARS_STRUCT.size + _TRAILER_STRUCT.size
+    
     @staticmethod
     def encode(
         timestamp_ms: int,
@@ -99,34 +100,21 @@ class AFEMeasFrame:
         if len(tcell_cc) != 16:
             raise ValueError(f"tcell_cc must have 16 elements, got {len(tcell_cc)}")
         
-        # Pack payload
-        payload = struct.pack(
-            AFEMeasFrame.PAYLOAD_FORMAT,
-            timestamp_ms,
-            *vcell_mv.astype(np.uint16),
-            *tcell_cc.astype(np.int16),
-            pack_current_ma,
-            pack_voltage_mv,
-            status_flags
-        )
-        
-        # Build frame: SOF | msg_id | len | seq | payload | CRC16 | EOF
-        msg_id = AFEMeasFrame.MSG_ID
-        length = len(payload)
+        # Build frame: SOF | msg_id | len | seq | payload (cell arrays as raw little-endian bytes)
         seq = sequence & 0xFFFF  # Wrap at 65535
+        frame = (
+            AFEMeasFrame._HEADER_STRUCT.pack(SOF, AFEMeasFrame.MSG_ID, AFEMeasFrame.PAYLOAD_SIZE,
+                                             seq, timestamp_ms)
+            + vcell_mv.astype('<u2').tobytes()
+            + tcell_cc.astype('<i2').tobytes()
+            + AFEMeasFrame._SCALARS_STRUCT.pack(pack_current_ma, pack_voltage_mv, status_flags)
+        )
         
-        # Calculate CRC on: msg_id | len | seq | payload
-        crc_data = struct.pack('<BBH', msg_id, length, seq) + payload
-        crc = crc16_ccitt(crc_data)
-        
-        # Assemble frame
-        frame = struct.pack('<B', SOF) + \
-                struct.pack('<BBH', msg_id, length, seq) + \
-                payload + \
-                struct.pack('<H', crc) + \
-                struct.pack('<B', EOF)
+        # Calculate CRC on: msg_id | len | seq | payload (without copying the frame)
+        crc = crc16_ccitt(memoryview(frame)[1:])
         
-        return frame
+        # Append CRC16 | EOF
+        return frame + AFEMeasFrame._TRAILER_STRUCT.pack(crc, EOF)
     
     @staticmethod
     def decode(frame: bytes) -> Optional[dict]:
@@ -148,9 +136,9 @@ class AFEMeasFrame:
             return None
         
         # Extract header
-        msg_id, length, seq = struct.unpack('<BBH', frame[1:5])
+        msg_id, length, seq = struct.unpack_from('<BBH', frame, 1)
         
-        if msg_id != AFEMeasFrame.MSG_ID:
+        if msg_id != AFEMeasFrame.MSG_ID or length != AFEMeasFrame.PAYLOAD_SIZE:
             return None
         
         # Check frame size
@@ -158,26 +146,23 @@ class AFEMeasFrame:
         if len(frame) != expected_size:
             return None
         
-        # Extract payload
-        payload = frame[5:5+length]
-        
         # Verify CRC
-        crc_data = frame[1:5+length]  # msg_id | len | seq | payload
+        crc_data = memoryview(frame)[1:5+length]  # msg_id | len | seq | payload
         expected_crc = crc16_ccitt(crc_data)
-        received_crc = struct.unpack('<H', frame[5+length:5+length+2])[0]
+        received_crc = struct.unpack_from('<H', frame, 5+length)[0]
         
         if expected_crc != received_crc:
             return None
         
-        # Unpack payload
-        unpacked = struct.unpack(AFEMeasFrame.PAYLOAD_FORMAT, payload)
-        
-        timestamp_ms = unpacked[0]
-        vcell_mv = np.array(unpacked[1:17], dtype=np.uint16)
-        tcell_cc = np.array(unpacked[17:33], dtype=np.int16)
-        pack_current_ma = unpacked[33]
-        pack_voltage_mv = unpacked[34]
-        status_flags = unpacked[35]
+        # Unpack payload (cell arrays straight from the frame bytes, as native-dtype copies)
+        timestamp_ms = struct.unpack_from('<I', frame, 5)[0]
+        vcell_mv = np.frombuffer(frame, dtype='<u2', count=16,
+                                 offset=AFEMeasFrame._VCELL_OFFSET).astype(np.uint16)
+        tcell_cc = np.frombuffer(frame, dtype='<i2', count=16,
+                                 offset=AFEMeasFrame._TCELL_OFFSET).astype(np.int16)
+        pack_current_ma, pack_voltage_mv, status_flags = AFEMeasFrame._SCALARS_STRUCT.unpack_from(
+            frame, AFEMeasFrame._SCALARS_OFFSET
+        )
         
         return {
             'timestamp_ms': timestamp_ms,
@@ -190,6 +175,18 @@ class AFEMeasFrame:
         }
 
 
+def _out_of_range(values: np.ndarray, low: int, high: int, wire_dtype: type) -> bool:
+    """True if any (non-NaN) element of values lies outside [low, high] (the wire_dtype range)."""
+    # Arrays whose dtype casts safely (e.g. already uint16/int16) are in range by construction
+    if np.can_cast(values.dtype, wire_dtype):
+        return False
+    if values.dtype.kind in 'iu':
+        # One reduction each, no boolean temporaries
+        return bool(values.min() < low or values.max() > high)
+    # Floats (min/max would propagate NaN, which the comparisons below ignore)
+    return bool(np.any(values < low) or np.any(values > high))
+
+
 def validate_afe_meas_data(data: dict) -> Tuple[bool, Optional[str]]:
     """
     Validate AFE measurement data before encoding.
@@ -211,14 +208,14 @@ def validate_afe_meas_data(data: dict) -> Tuple[bool, Optional[str]]:
     vcell = data['vcell_mv']
     if not isinstance(vcell, np.ndarray) or len(vcell) != 16:
         return False, "vcell_mv must be numpy array with 16 elements"
-    if np.any(vcell < 0) or np.any(vcell > 65535):
+    if _out_of_range(vcell, 0, 65535, np.uint16):
         return False, "vcell_mv values must be in range [0, 65535] mV"
     
     # Validate tcell_cc
     tcell = data['tcell_cc']
     if not isinstance(tcell, np.ndarray) or len(tcell) != 16:
         return False, "tcell_cc must be numpy array with 16 elements"
-    if np.any(tcell < -32768) or np.any(tcell > 32767):
+    if _out_of_range(tcell, -32768, 32767, np.int16):
         return False, "tcell_cc values must be in range [-32768, 32767] centi-°C"
     
     # Validate pack_current_ma
@@ -7,6 +7,7 @@ Matches MCU-side frame format:
 - CRC16-CCITT on data only
 """
 
+import binascii
 import struct
 from typing import Optional
 import numpy as np
@@ -39,19 +40,9 @@ def crc16_ccitt_be(data: bytes, initial: int = 0xFFFF) -> int:
     Returns:
         CRC16-CCITT value (uint16)
     """
-    polynomial = 0x1021
-    crc = initial
-    
-    for byte in data:
-        crc ^= (byte << 8)
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = (crc << 1) ^ polynomial
-            else:
-                crc <<= 1
-            crc &= 0xFFFF
-    
-    return crc
+    # binascii.crc_hqx implements this exact CRC (polynomial 0x1021,
+    # MSB-first, no reflection, no XOR out) in C
+    return binascii.crc_hqx(data, initial & 0xFFFF)
 
 
 def pack_int16_be(value: int) -> bytes:
@@ -79,6 +70,24 @@ def pack_float_be(value: float) -> bytes:
     return struct.pack('>f', float(value))
 
 
+def decode_cell_voltages(
+    frame: bytes,
+    num_cells: int = BS_NR_OF_STRINGS * BS_NR_OF_MODULES_PER_STRING * BS_NR_OF_CELL_BLOCKS_PER_MODULE
+) -> np.ndarray:
+    """
+    Decode the cell voltage section (section 1) of a complete SIL frame.
+    
+    Args:
+        frame: Complete frame bytes (header included)
+        num_cells: Total number of cell voltages (strings * modules * cells)
+    
+    Returns:
+        numpy int16 array of cell voltages in mV (open wire = 0)
+    """
+    # Data payload starts after header, version and 2-byte length
+    return np.frombuffer(frame, dtype='>i2', count=num_cells, offset=4).astype(np.int16)
+
+
 class SILFrameEncoder:
     """
     Encodes BMS data into MCU-compatible SIL frame format.
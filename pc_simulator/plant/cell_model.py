@@ -10,10 +10,61 @@ This module implements a detailed ECM for LiFePO₄ cells with:
 - Thermal model (self-heating)
 """
 
+import bisect
+import math
 import numpy as np
+from dataclasses import dataclass
 from typing import Tuple, Optional
 
 
+@dataclass(frozen=True)
+class ECMParams:
+    """
+    Immutable bundle of cell model constants used in the update hot path.
+    
+    Built once from the LiFePO4Cell class constants and shared by all cells,
+    so the update loop reads plain slots instead of walking the class
+    attribute chain. Time constants are pre-multiplied (tau = R * C).
+    """
+    __slots__ = (
+        'R1', 'C1', 'R2', 'C2', 'tau1', 'tau2',
+        'ocv_temp_coeff', 'capacity_temp_coeff',
+        'fade_rate', 'resistance_increase_rate',
+        'thermal_mass', 'thermal_resistance',
+    )
+    
+    R1: float
+    C1: float
+    R2: float
+    C2: float
+    tau1: float
+    tau2: float
+    ocv_temp_coeff: float
+    capacity_temp_coeff: float
+    fade_rate: float
+    resistance_increase_rate: float
+    thermal_mass: float
+    thermal_resistance: float
+    
+    @classmethod
+    def from_cell_class(cls, cell_cls) -> 'ECMParams':
+        """Build parameters from the class constants of a cell model class."""
+        return cls(
+            R1=cell_cls.R1,
+            C1=cell_cls.C1,
+            R2=cell_cls.R2,
+            C2=cell_cls.C2,
+            tau1=cell_cls.R1 * cell_cls.C1,
+            tau2=cell_cls.R2 * cell_cls.C2,
+            ocv_temp_coeff=cell_cls.OCV_TEMP_COEFF,
+            capacity_temp_coeff=cell_cls.CAPACITY_TEMP_COEFF,
+            fade_rate=cell_cls.FADE_RATE,
+            resistance_increase_rate=cell_cls.RESISTANCE_INCREASE_RATE,
+            thermal_mass=cell_cls.THERMAL_MASS,
+            thermal_resistance=cell_cls.THERMAL_RESISTANCE
+        )
+
+
 class LiFePO4Cell:
     """
     LiFePO₄ Battery Cell Equivalent Circuit Model
@@ -34,6 +85,20 @@ class LiFePO4Cell:
         cycles: Number of charge/discharge cycles (default: 0)
     """
     
+    # Fixed attribute layout: no per-instance __dict__ (matters for large packs)
+    __slots__ = (
+        'params',
+        '_capacity_nominal_ah', '_capacity_actual_ah',
+        '_soc', '_temperature_c', '_ambient_temp_c', '_cycles', '_cycle_sqrt',
+        '_base_resistance_multiplier', '_resistance_multiplier', '_r0_aging_factor',
+        '_v_rc1', '_v_rc2', '_rc_cache_key', '_rc_cache_val',
+        '_last_current_direction', '_hysteresis_soc', '_last_ocv',
+        '_calendar_aging_time_hours', '_last_update_time_hours',
+        '_storage_soc', '_storage_temp',
+        '_fault_state',
+        '_soc_table', '_ocv_table_discharge', '_ocv_table_charge',
+    )
+    
     # OCV-SOC lookup tables (101 points: 0% to 100%)
     # Typical LiFePO₄ curve: flat plateau around 3.2V, steep ends
     # Precision: 0.001V (1mV) for better accuracy, especially in steep regions
@@ -250,6 +315,16 @@ class LiFePO4Cell:
         [100.0, 3.472],  # 100% - fully charged (adjusted to match real data: 3.472V)
     ])
     
+    # Plain-list copies of the OCV tables for scalar bisect lookups (no numpy allocation)
+    _SOC_TABLE_LIST = (_OCV_SOC_TABLE_DISCHARGE[:, 0] / 100.0).tolist()
+    _OCV_DISCHARGE_LIST = _OCV_SOC_TABLE_DISCHARGE[:, 1].tolist()
+    _OCV_CHARGE_LIST = _OCV_SOC_TABLE_CHARGE[:, 1].tolist()
+    
+    # Shared ndarray views of the OCV tables for batched (multi-cell) lookups
+    _SOC_TABLE = _OCV_SOC_TABLE_DISCHARGE[:, 0] / 100.0
+    _OCV_DISCHARGE = _OCV_SOC_TABLE_DISCHARGE[:, 1]
+    _OCV_CHARGE = _OCV_SOC_TABLE_CHARGE[:, 1]
+    
     # ECM parameters - 2RC network
     # Fast RC network (short time constant)
     # Reduced resistances for high C-rate operation to prevent excessive voltage drops
@@ -301,25 +376,35 @@ class LiFePO4Cell:
             ambient_temp_c: Ambient temperature in °C (default: 25.0)
             resistance_multiplier: Base resistance multiplier for cell-to-cell variation (default: 1.0)
         """
+        # Shared immutable model constants (see ECMParams)
+        self.params = _DEFAULT_ECM_PARAMS
+        
         # Store nominal capacity
-        self._capacity_nominal_ah = capacity_ah
+        self._capacity_nominal_ah = float(capacity_ah)
         
         # Initialize state variables
-        self._soc = np.clip(initial_soc, 0.0, 1.0)
-        self._temperature_c = temperature_c
+        # Plain Python floats throughout so update() never returns numpy scalars
+        self._soc = min(max(float(initial_soc), 0.0), 1.0)
+        self._temperature_c = float(temperature_c)
         self._ambient_temp_c = ambient_temp_c
         self._cycles = cycles
+        self._cycle_sqrt = math.sqrt(max(cycles, 0))  # Only changes via set_aging()
         
         # Store base resistance multiplier (for cell-to-cell variation)
-        self._base_resistance_multiplier = max(resistance_multiplier, 0.1)  # Prevent negative or zero multiplier
+        self._base_resistance_multiplier = max(float(resistance_multiplier), 0.1)  # Prevent negative or zero multiplier
         
         # 2RC network state (voltages across C1 and C2)
         self._v_rc1 = 0.0  # Fast RC network voltage
         self._v_rc2 = 0.0  # Slow RC network voltage
         
+        # Last (rc_scale_factor, dt_sec) and the RC coefficients computed for it
+        self._rc_cache_key = None
+        self._rc_cache_val = None
+        
         # Hysteresis tracking
         self._last_current_direction = 0  # 1 = charging, -1 = discharging, 0 = rest
         self._hysteresis_soc = initial_soc  # SOC at last current direction change
+        self._last_ocv = None  # OCV (V) computed by the most recent update()
         
         # Calendar aging tracking
         self._calendar_aging_time_hours = 0.0  # Total time in hours (for calendar aging)
@@ -347,7 +432,7 @@ class LiFePO4Cell:
         - Calendar aging: Capacity fade with time, temperature, and storage SOC
         """
         # Cycle aging: Capacity fade
-        cycle_fade_factor = 1.0 - self.FADE_RATE * np.sqrt(max(self._cycles, 0))
+        cycle_fade_factor = 1.0 - self.params.fade_rate * self._cycle_sqrt
         cycle_fade_factor = max(cycle_fade_factor, 0.5)  # Limit to 50% fade
         
         # Calendar aging: Time-based capacity fade
@@ -355,7 +440,7 @@ class LiFePO4Cell:
         # Aging is faster at high temperature and extreme SOC
         if self._calendar_aging_time_hours > 0:
             temp_kelvin = self._storage_temp + 273.15
-            arrhenius_factor = np.exp(
+            arrhenius_factor = math.exp(
                 -self.CALENDAR_AGING_ACTIVATION_ENERGY / 
                 (self.GAS_CONSTANT * temp_kelvin)
             )
@@ -380,7 +465,10 @@ class LiFePO4Cell:
         self._capacity_actual_ah = self._capacity_nominal_ah * total_fade_factor
         
         # Resistance increase: Only cycle-based (calendar aging has minimal effect on resistance)
-        self._resistance_multiplier = 1.0 + self.RESISTANCE_INCREASE_RATE * max(self._cycles, 0)
+        self._resistance_multiplier = 1.0 + self.params.resistance_increase_rate * max(self._cycles, 0)
+        
+        # Cached R0 factor: base 0.5 mOhm * cell-to-cell variation * aging multiplier
+        self._r0_aging_factor = 0.5 * self._base_resistance_multiplier * self._resistance_multiplier
     
     def get_ocv(
         self, 
@@ -392,13 +480,14 @@ class LiFePO4Cell:
         Get Open Circuit Voltage (OCV) for given SOC and temperature with hysteresis.
         
         Args:
-            soc_pct: State of charge in percent (0-100). If None, use current SOC.
+            soc_pct: State of charge in percent (0-100), scalar or array.
+                     If None, use current SOC.
             temperature_c: Temperature in °C. If None, use current temperature.
             current_direction: Current direction (1=charge, -1=discharge, 0=rest).
                              If None, use last known direction.
         
         Returns:
-            OCV in volts
+            OCV in volts (array if soc_pct is an array)
         """
         if soc_pct is None:
             soc = self._soc
@@ -429,21 +518,73 @@ class LiFePO4Cell:
                 ocv_table = self._ocv_table_discharge
             else:
                 # No history - use average of charge and discharge
-                ocv_charge = np.interp(soc, self._soc_table, self._ocv_table_charge)
-                ocv_discharge = np.interp(soc, self._soc_table, self._ocv_table_discharge)
+                if soc_pct is not None and np.ndim(soc) > 0:
+                    # Array of SOCs: interpolate both curves in one pass each
+                    ocv_base = (np.interp(soc, self._soc_table, self._ocv_table_charge)
+                                + np.interp(soc, self._soc_table, self._ocv_table_discharge)) / 2.0
+                    return ocv_base + self.params.ocv_temp_coeff * (temp - 25.0)
+                # Single bisect shared by both curves (same result as np.interp)
+                soc_tbl = self._SOC_TABLE_LIST
+                c_tbl = self._OCV_CHARGE_LIST
+                d_tbl = self._OCV_DISCHARGE_LIST
+                if soc >= soc_tbl[-1]:
+                    ocv_charge = c_tbl[-1]
+                    ocv_discharge = d_tbl[-1]
+                elif soc <= soc_tbl[0]:
+                    ocv_charge = c_tbl[0]
+                    ocv_discharge = d_tbl[0]
+                else:
+                    idx = bisect.bisect_right(soc_tbl, soc) - 1
+                    dx = soc - soc_tbl[idx]
+                    span = soc_tbl[idx + 1] - soc_tbl[idx]
+                    ocv_charge = (c_tbl[idx + 1] - c_tbl[idx]) / span * dx + c_tbl[idx]
+                    ocv_discharge = (d_tbl[idx + 1] - d_tbl[idx]) / span * dx + d_tbl[idx]
                 ocv_base = (ocv_charge + ocv_discharge) / 2.0
                 # Apply temperature correction
-                ocv = ocv_base + self.OCV_TEMP_COEFF * (temp - 25.0)
+                ocv = ocv_base + self.params.ocv_temp_coeff * (temp - 25.0)
                 return ocv
         
         # Interpolate OCV from selected lookup table
         ocv_base = np.interp(soc, self._soc_table, ocv_table)
         
         # Apply temperature correction: OCV_temp = OCV_base + temp_coeff * (T - 25°C)
-        ocv = ocv_base + self.OCV_TEMP_COEFF * (temp - 25.0)
+        ocv = ocv_base + self.params.ocv_temp_coeff * (temp - 25.0)
         
         return ocv
     
+    @classmethod
+    def get_ocv_batch(
+        cls,
+        soc: np.ndarray,
+        temperature_c: np.ndarray,
+        current_direction: np.ndarray,
+        ocv_temp_coeff: float = OCV_TEMP_COEFF
+    ) -> np.ndarray:
+        """
+        Vectorised get_ocv() for many cells sharing the class OCV tables.
+        
+        Equivalent to calling get_ocv(current_direction=0) on each cell with the
+        given SOC, temperature and last current direction.
+        
+        Args:
+            soc: State of charge as fraction (0-1), one entry per cell
+            temperature_c: Temperatures in °C
+            current_direction: Last current direction per cell (1=charge, -1=discharge, 0=rest)
+            ocv_temp_coeff: OCV temperature coefficient in V/°C
+        
+        Returns:
+            OCV in volts per cell
+        """
+        ocv_charge = np.interp(soc, cls._SOC_TABLE, cls._OCV_CHARGE)
+        ocv_discharge = np.interp(soc, cls._SOC_TABLE, cls._OCV_DISCHARGE)
+        
+        # Charge curve, discharge curve, or their average with no direction history
+        ocv_base = np.where(
+            current_direction > 0, ocv_charge,
+            np.where(current_direction < 0, ocv_discharge, (ocv_charge + ocv_discharge) / 2.0)
+        )
+        return ocv_base + ocv_temp_coeff * (temperature_c - 25.0)
+    
     def get_internal_resistance(self, soc_pct: Optional[float] = None, temperature_c: Optional[float] = None) -> float:
         """
         Get internal resistance R0 as function of SOC and temperature.
@@ -451,11 +592,12 @@ class LiFePO4Cell:
         Formula: R0(SOC, T) = R0_base(SOC) * [1 - 0.005 * (T - 25)] * base_multiplier * aging_factor
         
         Args:
-            soc_pct: State of charge in percent (0-100). If None, use current SOC.
+            soc_pct: State of charge in percent (0-100), scalar or array.
+                     If None, use current SOC.
             temperature_c: Temperature in °C. If None, use current temperature.
         
         Returns:
-            Internal resistance in mΩ
+            Internal resistance in mΩ (array if soc_pct is an array)
         """
         if soc_pct is None:
             soc = self._soc
@@ -473,21 +615,23 @@ class LiFePO4Cell:
         # - 1.4x at 0% SOC (slightly reduced from 1.5x for better low-SOC voltage match)
         # - 1.0x at 50% SOC (baseline)
         # - 0.75x at 100% SOC (slightly reduced from 0.8x for better high-SOC voltage match)
-        if soc <= 0.5:
+        if soc_pct is not None and np.ndim(soc) > 0:
+            # Array of SOCs: both linear segments below, selected per element
+            r0_base_multiplier = np.where(soc <= 0.5, 1.4 - (soc * 0.8), 1.0 - ((soc - 0.5) * 0.5))
+        elif soc <= 0.5:
             # Linear from 0% to 50%
             r0_base_multiplier = 1.4 - (soc * 0.8)  # 1.4 at 0%, 1.0 at 50%
         else:
             # Linear from 50% to 100%: reduce resistance at high SOC
             r0_base_multiplier = 1.0 - ((soc - 0.5) * 0.5)  # 1.0 at 50%, 0.75 at 100%
         
-        r0_base_mohm = 0.5 * r0_base_multiplier
-        
         # Temperature dependence: -0.5% per °C (lower R0 at higher temp)
         temp_factor = 1.0 - 0.005 * (temp - 25.0)
         temp_factor = max(temp_factor, 0.5)  # Limit to 50% reduction
         
-        # Apply base multiplier (cell-to-cell variation) and aging multiplier
-        r0_mohm = r0_base_mohm * temp_factor * self._base_resistance_multiplier * self._resistance_multiplier
+        # Apply base R0 (0.5 mOhm), cell-to-cell variation and aging multiplier,
+        # all folded into _r0_aging_factor by _update_aging()
+        r0_mohm = r0_base_multiplier * temp_factor * self._r0_aging_factor
         
         # Apply fault-based resistance changes
         if hasattr(self, '_fault_state') and self._fault_state:
@@ -522,26 +666,32 @@ class LiFePO4Cell:
         # Convert current to Amperes
         current_a = current_ma / 1000.0
         
+        # Rest fast path: no self-heating and already at ambient, nothing to integrate
+        if abs(current_a) < 1e-6 and abs(self._temperature_c - self._ambient_temp_c) < 0.01:
+            return
+        
+        p = self.params
+        
         # Calculate power dissipation: P = I² * R0
         r0_ohm = self.get_internal_resistance() / 1000.0  # Convert mΩ to Ω
         power_w = (current_a ** 2) * r0_ohm
         
         # Heat transfer to ambient: Q = (T_cell - T_ambient) / R_thermal
         temp_diff = self._temperature_c - self._ambient_temp_c
-        heat_transfer_w = temp_diff / self.THERMAL_RESISTANCE
+        heat_transfer_w = temp_diff / p.thermal_resistance
         
         # Net power: P_net = P_heating - Q_transfer
         net_power_w = power_w - heat_transfer_w
         
         # Temperature change: dT = P_net * dt / C_thermal
         dt_sec = dt_ms / 1000.0
-        dtemp = (net_power_w * dt_sec) / self.THERMAL_MASS
+        dtemp = (net_power_w * dt_sec) / p.thermal_mass
         
         # Update temperature
         self._temperature_c += dtemp
         
         # Limit temperature to reasonable range
-        self._temperature_c = np.clip(self._temperature_c, -40.0, 85.0)
+        self._temperature_c = min(max(self._temperature_c, -40.0), 85.0)
     
     def update(
         self,
@@ -569,11 +719,13 @@ class LiFePO4Cell:
         Returns:
             Tuple of (terminal_voltage_mv, soc_pct)
         """
+        p = self.params
+        
         # Update thermal model (if not forced temperature)
         if temperature_c is None:
             self._update_thermal_model(current_ma, dt_ms, ambient_temp_c)
         else:
-            self._temperature_c = temperature_c
+            self._temperature_c = float(temperature_c)
         
         # Apply fault effects (modifies current and temperature)
         fault_current_ma, temp_adjustment = self._apply_fault_effects(current_ma, dt_ms)
@@ -581,7 +733,7 @@ class LiFePO4Cell:
         
         # Get temperature-dependent capacity
         # Capacity increases with temperature: Q(T) = Q_nominal * [1 + 0.005 * (T - 25)]
-        temp_capacity_factor = 1.0 + self.CAPACITY_TEMP_COEFF * (self._temperature_c - 25.0)
+        temp_capacity_factor = 1.0 + p.capacity_temp_coeff * (self._temperature_c - 25.0)
         fault_capacity_factor = self._get_fault_capacity_factor()
         capacity_ah = self._capacity_actual_ah * temp_capacity_factor * fault_capacity_factor
         
@@ -593,8 +745,7 @@ class LiFePO4Cell:
         dt_hours = dt_ms / (1000.0 * 3600.0)
         dsoc = (current_a * dt_hours) / capacity_ah
         
-        self._soc += dsoc
-        self._soc = np.clip(self._soc, 0.0, 1.0)
+        self._soc = min(max(float(self._soc + dsoc), 0.0), 1.0)
         
         # Update current direction for hysteresis
         if current_ma > 0.001:  # Charging (small threshold to avoid noise)
@@ -629,23 +780,35 @@ class LiFePO4Cell:
             rc_scale_factor = 1.0 / (1.0 + 0.15 * (current_c_rate - 1.0))
             rc_scale_factor = max(rc_scale_factor, 0.3)  # Minimum 30% to prevent zero resistance
         
-        r1_effective = self.R1 * rc_scale_factor
-        r2_effective = self.R2 * rc_scale_factor
-        
-        # Fast RC network (R1-C1): short time constant
-        tau1 = r1_effective * self.C1  # Time constant depends on effective resistance
-        dt_sec = dt_ms / 1000.0
-        exp_factor1 = np.exp(-dt_sec / tau1) if tau1 > 0 else 0.0
-        
-        # Update fast RC voltage using effective resistance
-        self._v_rc1 = self._v_rc1 * exp_factor1 + current_a * r1_effective * (1.0 - exp_factor1)
-        
-        # Slow RC network (R2-C2): long time constant
-        tau2 = r2_effective * self.C2  # Time constant depends on effective resistance
-        exp_factor2 = np.exp(-dt_sec / tau2) if tau2 > 0 else 0.0
-        
-        # Update slow RC voltage using effective resistance
-        self._v_rc2 = self._v_rc2 * exp_factor2 + current_a * r2_effective * (1.0 - exp_factor2)
+        # Rest fast path: no current and both RC networks already relaxed
+        if not (abs(current_a) < 1e-6 and abs(self._v_rc1) < 1e-6 and abs(self._v_rc2) < 1e-6):
+            dt_sec = dt_ms / 1000.0
+            
+            # Effective resistances and decay factors only depend on (rc_scale_factor, dt),
+            # which are constant for steady current - reuse the last computed set
+            rc_cache_key = (rc_scale_factor, dt_sec)
+            if rc_cache_key == self._rc_cache_key:
+                r1_effective, r2_effective, exp_factor1, exp_factor2 = self._rc_cache_val
+            else:
+                r1_effective = p.R1 * rc_scale_factor
+                r2_effective = p.R2 * rc_scale_factor
+                
+                # Fast RC network (R1-C1): short time constant
+                tau1 = p.tau1 * rc_scale_factor  # Time constant depends on effective resistance
+                exp_factor1 = math.exp(-dt_sec / tau1) if tau1 > 0 else 0.0
+                
+                # Slow RC network (R2-C2): long time constant
+                tau2 = p.tau2 * rc_scale_factor  # Time constant depends on effective resistance
+                exp_factor2 = math.exp(-dt_sec / tau2) if tau2 > 0 else 0.0
+                
+                self._rc_cache_key = rc_cache_key
+                self._rc_cache_val = (r1_effective, r2_effective, exp_factor1, exp_factor2)
+            
+            # Update fast RC voltage using effective resistance
+            self._v_rc1 = self._v_rc1 * exp_factor1 + current_a * r1_effective * (1.0 - exp_factor1)
+            
+            # Update slow RC voltage using effective resistance
+            self._v_rc2 = self._v_rc2 * exp_factor2 + current_a * r2_effective * (1.0 - exp_factor2)
         
         # Calculate terminal voltage
         # V_terminal = OCV - |I|*R0 - |V_RC1| - |V_RC2|
@@ -653,6 +816,7 @@ class LiFePO4Cell:
         # IR drop magnitude = |I|*R0 (always positive, subtracts from OCV)
         # RC voltage drops are always positive magnitude (subtract from OCV)
         ocv = self.get_ocv(current_direction=new_direction)
+        self._last_ocv = ocv
         r0_ohm = self.get_internal_resistance() / 1000.0  # Convert mΩ to Ω
         ir_drop_magnitude = abs(current_a) * r0_ohm
         v_terminal = ocv - ir_drop_magnitude - abs(self._v_rc1) - abs(self._v_rc2)
@@ -681,9 +845,9 @@ class LiFePO4Cell:
             self._last_update_time_hours = current_time_hours
         
         # Convert to mV
-        voltage_mv = v_terminal * 1000.0
+        voltage_mv = float(v_terminal) * 1000.0
         
-        # Return voltage in mV and SOC in percent
+        # Return voltage in mV and SOC in percent (Python floats, never numpy scalars)
         return voltage_mv, self._soc * 100.0
     
     def set_aging(self, cycles: int, calendar_aging_hours: Optional[float] = None):
@@ -695,10 +859,81 @@ class LiFePO4Cell:
             calendar_aging_hours: Total calendar aging time in hours (optional)
         """
         self._cycles = max(cycles, 0)
+        self._cycle_sqrt = math.sqrt(self._cycles)
         if calendar_aging_hours is not None:
             self._calendar_aging_time_hours = max(calendar_aging_hours, 0.0)
         self._update_aging()
     
+    @property
+    def soc_pct(self) -> float:
+        """State of charge in percent (0-100)."""
+        return self._soc * 100.0
+    
+    @property
+    def voltage_mv(self) -> float:
+        """Cell voltage in mV as reported by get_state() (no state dict built)."""
+        return self.get_ocv() * 1000.0
+    
+    @property
+    def temperature_c(self) -> float:
+        """Cell temperature in °C."""
+        return self._temperature_c
+    
+    @property
+    def capacity_ah(self) -> float:
+        """Aged capacity in Ah."""
+        return self._capacity_actual_ah
+    
+    @property
+    def cycles(self) -> int:
+        """Number of charge/discharge cycles."""
+        return self._cycles
+    
+    @property
+    def rc1_voltage_v(self) -> float:
+        """Fast RC network voltage in V."""
+        return self._v_rc1
+    
+    @property
+    def rc2_voltage_v(self) -> float:
+        """Slow RC network voltage in V."""
+        return self._v_rc2
+    
+    @property
+    def current_direction(self) -> int:
+        """Last current direction (1=charge, -1=discharge, 0=rest)."""
+        return self._last_current_direction
+    
+    @property
+    def last_ocv_v(self) -> Optional[float]:
+        """OCV in volts used by the most recent update() (None before the first update)."""
+        return self._last_ocv
+    
+    def populate_state(self, out: dict) -> dict:
+        """
+        Write current cell state into an existing dictionary.
+        
+        Same keys as get_state(), but reuses the caller's dict so that
+        high-rate logging does not allocate a new dict every step.
+        
+        Args:
+            out: Dictionary to fill (keys are overwritten in place)
+        
+        Returns:
+            The same dictionary
+        """
+        out['soc_pct'] = self._soc * 100.0
+        out['voltage_mv'] = self.voltage_mv
+        out['temperature_c'] = self._temperature_c
+        out['capacity_ah'] = self._capacity_actual_ah
+        out['internal_resistance_mohm'] = self.get_internal_resistance()
+        out['cycles'] = self._cycles
+        out['calendar_aging_hours'] = self._calendar_aging_time_hours
+        out['rc1_voltage_v'] = self._v_rc1
+        out['rc2_voltage_v'] = self._v_rc2
+        out['current_direction'] = self._last_current_direction
+        return out
+    
     def get_state(self) -> dict:
         """
         Get current cell state.
@@ -706,18 +941,7 @@ class LiFePO4Cell:
         Returns:
             Dictionary with cell state variables
         """
-        return {
-            'soc_pct': self._soc * 100.0,
-            'voltage_mv': self.get_ocv() * 1000.0,
-            'temperature_c': self._temperature_c,
-            'capacity_ah': self._capacity_actual_ah,
-            'internal_resistance_mohm': self.get_internal_resistance(),
-            'cycles': self._cycles,
-            'calendar_aging_hours': self._calendar_aging_time_hours,
-            'rc1_voltage_v': self._v_rc1,
-            'rc2_voltage_v': self._v_rc2,
-            'current_direction': self._last_current_direction
-        }
+        return self.populate_state({})
     
     def reset(self, soc_pct: Optional[float] = None, temperature_c: Optional[float] = None):
         """
@@ -728,12 +952,13 @@ class LiFePO4Cell:
             temperature_c: New temperature in °C. If None, keep current.
         """
         if soc_pct is not None:
-            self._soc = np.clip(soc_pct / 100.0, 0.0, 1.0)
+            self._soc = min(max(float(soc_pct) / 100.0, 0.0), 1.0)
         if temperature_c is not None:
-            self._temperature_c = temperature_c
+            self._temperature_c = float(temperature_c)
         self._v_rc1 = 0.0
         self._v_rc2 = 0.0
         self._last_current_direction = 0
+        self._last_ocv = None
         # Clear fault state on reset
         self._fault_state = {}
     
@@ -771,7 +996,7 @@ class LiFePO4Cell:
             modified_current -= i_short_ma
             # Short circuit also generates heat
             power_w = (i_short_a ** 2) * r_short_ohm
-            temp_adjustment += (power_w * dt_ms / 1000.0) / self.THERMAL_MASS
+            temp_adjustment += (power_w * dt_ms / 1000.0) / self.params.thermal_mass
         
         # Thermal runaway - temperature escalation
         if 'thermal_runaway' in self._fault_state and self._fault_state['thermal_runaway'].get('active', False):
@@ -794,3 +1019,6 @@ class LiFePO4Cell:
         
         return factor
 
+
+# Default parameter set shared by every LiFePO4Cell instance
+_DEFAULT_ECM_PARAMS = ECMParams.from_cell_class(LiFePO4Cell)
@@ -1,11 +1,38 @@
 """Checkpoint manager for saving and restoring model parameters."""
+import gzip
+import io
 import json
+import math
 import os
+from datetime import datetime
 from pathlib import Path
 import numpy as np
 
+# orjson is optional: faster JSON checkpoints with native ndarray support
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 class ModelCheckpoint:
-    """Manages checkpoints for battery model parameters."""
+    """Manages checkpoints for battery model parameters.
+    
+    Checkpoints are written as .npz files: numpy arrays are stored as raw
+    binary buffers and all other values go into a small JSON metadata entry.
+    Legacy .json checkpoints can still be loaded.
+    """
+    
+    BINARY_SUFFIX = ".npz"
+    JSON_SUFFIX = ".json"
+    GZIP_JSON_SUFFIX = ".json.gz"
+    # All on-disk formats; a checkpoint name has a file in at most one of them
+    SUFFIXES = (BINARY_SUFFIX, JSON_SUFFIX, GZIP_JSON_SUFFIX)
+    META_KEY = "__meta__"
+    # JSON checkpoints record which fields were arrays under this key
+    ARRAY_FIELDS_KEY = "__arrays__"
+    # Array fields of legacy JSON checkpoints written without ARRAY_FIELDS_KEY
+    ARRAY_KEYS = frozenset({'ocv_soc_table_discharge', 'ocv_soc_table_charge'})
     
     def __init__(self, checkpoint_dir="checkpoints"):
         """Initialize checkpoint manager.
@@ -16,75 +43,205 @@ class ModelCheckpoint:
         self.checkpoint_dir = Path(checkpoint_dir)
         self.checkpoint_dir.mkdir(exist_ok=True)
     
-    def save_checkpoint(self, checkpoint_name, parameters):
+    def save_checkpoint(self, checkpoint_name, parameters, binary=True, compress=False):
         """Save model parameters to a checkpoint.
         
         Args:
             checkpoint_name: Name of the checkpoint (e.g., "checkpoint_1")
             parameters: Dictionary of parameters to save
+            binary: If True (default), write a .npz checkpoint with raw array
+                buffers; otherwise write a legacy .json checkpoint
+            compress: If True, deflate-compress the array buffers in the .npz,
+                or gzip the JSON output into a .json.gz file (smaller files for
+                large tables, at some save-time cost)
         """
-        checkpoint_file = self.checkpoint_dir / f"{checkpoint_name}.json"
-        
-        # Convert numpy arrays to lists for JSON serialization
-        serializable_params = {}
-        for key, value in parameters.items():
-            if isinstance(value, np.ndarray):
-                serializable_params[key] = value.tolist()
-            elif isinstance(value, (np.integer, np.floating)):
-                serializable_params[key] = float(value)
-            else:
-                serializable_params[key] = value
+        if binary:
+            checkpoint_file = self.checkpoint_dir / f"{checkpoint_name}{self.BINARY_SUFFIX}"
+            
+            # Arrays keep their dtype/shape as raw buffers; everything else is JSON metadata
+            arrays = {}
+            meta = {}
+            for key, value in parameters.items():
+                if isinstance(value, np.ndarray):
+                    arrays[key] = value
+                elif isinstance(value, np.integer):
+                    meta[key] = int(value)
+                elif isinstance(value, np.floating):
+                    meta[key] = float(value)
+                else:
+                    meta[key] = value
+            arrays[self.META_KEY] = np.array(json.dumps(meta))
+            
+            savez = np.savez_compressed if compress else np.savez
+            buffer = io.BytesIO()
+            savez(buffer, **arrays)
+            payload = buffer.getvalue()
+        else:
+            suffix = self.GZIP_JSON_SUFFIX if compress else self.JSON_SUFFIX
+            checkpoint_file = self.checkpoint_dir / f"{checkpoint_name}{suffix}"
+            
+            # Tag array fields so loading does not have to guess them
+            array_keys = [key for key, value in parameters.items() if isinstance(value, np.ndarray)]
+            
+            payload = None
+            # orjson would write NaN/inf as null; those go through the stdlib
+            # writer below so the file is the same whether or not orjson is installed
+            if ORJSON_AVAILABLE and not self._has_non_finite(parameters):
+                # orjson serializes ndarrays natively (no tolist()); numpy scalars
+                # are converted to float exactly as in the stdlib writer
+                orjson_params = {
+                    key: float(value) if isinstance(value, (np.integer, np.floating)) else value
+                    for key, value in parameters.items()
+                }
+                orjson_params[self.ARRAY_FIELDS_KEY] = array_keys
+                try:
+                    payload = orjson.dumps(orjson_params, option=orjson.OPT_SERIALIZE_NUMPY)
+                except TypeError:
+                    # e.g. non-contiguous arrays or unsupported dtypes
+                    payload = None
+            
+            if payload is None:
+                # Convert numpy arrays to lists for JSON serialization
+                serializable_params = {}
+                for key, value in parameters.items():
+                    if isinstance(value, np.ndarray):
+                        serializable_params[key] = value.tolist()
+                    elif isinstance(value, (np.integer, np.floating)):
+                        serializable_params[key] = float(value)
+                    else:
+                        serializable_params[key] = value
+                serializable_params[self.ARRAY_FIELDS_KEY] = array_keys
+                # Compact separators: no indentation or padding
+                payload = json.dumps(serializable_params, separators=(',', ':')).encode('utf-8')
+            
+            if compress:
+                # Fastest gzip level: numeric JSON text still shrinks severalfold
+                payload = gzip.compress(payload, compresslevel=1)
+        
+        self._write_atomic(checkpoint_file, payload)
         
-        with open(checkpoint_file, 'w') as f:
-            json.dump(serializable_params, f, indent=2)
+        # Drop the same checkpoint in other formats so loading cannot pick up a stale copy
+        for suffix in self.SUFFIXES:
+            sibling = self.checkpoint_dir / f"{checkpoint_name}{suffix}"
+            if sibling != checkpoint_file:
+                sibling.unlink(missing_ok=True)
         
         print(f"✓ Checkpoint '{checkpoint_name}' saved to {checkpoint_file}")
         return checkpoint_file
     
+    @staticmethod
+    def _has_non_finite(value):
+        """True if value (or anything nested in it) holds a NaN or infinite float.
+        
+        Args:
+            value: Parameter value, dict, list/tuple or ndarray
+        """
+        if isinstance(value, (float, np.floating)):
+            return not math.isfinite(value)
+        if isinstance(value, np.ndarray):
+            return value.dtype.kind in 'fc' and not np.isfinite(value).all()
+        if isinstance(value, dict):
+            return any(ModelCheckpoint._has_non_finite(item) for item in value.values())
+        if isinstance(value, (list, tuple)):
+            return any(ModelCheckpoint._has_non_finite(item) for item in value)
+        return False
+    
+    @staticmethod
+    def _write_atomic(checkpoint_file, payload):
+        """Write a serialized checkpoint in one pass and atomically replace the target.
+        
+        The payload goes to a temporary file that is fsync'ed and then renamed
+        over the checkpoint, so a crash leaves either the old or the new file.
+        
+        Args:
+            checkpoint_file: Destination path
+            payload: Serialized checkpoint bytes
+        """
+        tmp_file = checkpoint_file.with_name(checkpoint_file.name + ".tmp")
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            view = memoryview(payload)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_file, checkpoint_file)
+    
     def load_checkpoint(self, checkpoint_name):
         """Load model parameters from a checkpoint.
         
+        save_checkpoint() keeps a single file per name, removing the same name
+        in other formats. If several exist anyway (e.g. copied in by hand),
+        binary (.npz) takes precedence over .json and .json.gz. The format is
+        detected from the file contents.
+        
         Args:
             checkpoint_name: Name of the checkpoint to load
             
         Returns:
             Dictionary of parameters
         """
-        checkpoint_file = self.checkpoint_dir / f"{checkpoint_name}.json"
-        
-        if not checkpoint_file.exists():
-            raise FileNotFoundError(f"Checkpoint '{checkpoint_name}' not found at {checkpoint_file}")
+        for suffix in self.SUFFIXES:
+            checkpoint_file = self.checkpoint_dir / f"{checkpoint_name}{suffix}"
+            if checkpoint_file.exists():
+                break
+        else:
+            raise FileNotFoundError(f"Checkpoint '{checkpoint_name}' not found in {self.checkpoint_dir}")
         
-        with open(checkpoint_file, 'r') as f:
-            parameters = json.load(f)
+        with open(checkpoint_file, 'rb') as f:
+            raw = f.read()
         
-        # Convert lists back to numpy arrays where needed
-        for key, value in parameters.items():
-            if isinstance(value, list) and len(value) > 0:
-                # Check if it's a 2D array (OCV tables)
-                if isinstance(value[0], list):
-                    parameters[key] = np.array(value)
-                else:
-                    # Try to convert to numpy array
-                    try:
-                        parameters[key] = np.array(value)
-                    except:
-                        pass
+        # .npz files are zip archives ("PK" magic); otherwise JSON, possibly gzipped
+        if raw[:2] == b'PK':
+            with np.load(io.BytesIO(raw), allow_pickle=False) as data:
+                parameters = json.loads(str(data[self.META_KEY]))
+                for key in data.files:
+                    if key != self.META_KEY:
+                        parameters[key] = data[key]
+        else:
+            if raw[:2] == b'\x1f\x8b':
+                raw = gzip.decompress(raw)
+            if ORJSON_AVAILABLE:
+                try:
+                    parameters = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    # NaN/Infinity tokens (stdlib-written files) are not valid for orjson
+                    parameters = json.loads(raw)
+            else:
+                parameters = json.loads(raw)
+            
+            # Convert tagged array fields back to numpy arrays
+            array_keys = parameters.pop(self.ARRAY_FIELDS_KEY, None)
+            if array_keys is None:
+                array_keys = self.ARRAY_KEYS & parameters.keys()
+            for key in array_keys:
+                parameters[key] = np.asarray(parameters[key])
         
         print(f"✓ Checkpoint '{checkpoint_name}' loaded from {checkpoint_file}")
         return parameters
     
     def list_checkpoints(self):
         """List all available checkpoints."""
-        checkpoints = list(self.checkpoint_dir.glob("*.json"))
-        if not checkpoints:
+        # Single directory scan; names only, no Path objects per entry.
+        # The set collapses a name present in several formats into one entry
+        names = set()
+        with os.scandir(self.checkpoint_dir) as entries:
+            for entry in entries:
+                for suffix in self.SUFFIXES:
+                    if entry.name.endswith(suffix) and entry.is_file():
+                        names.add(entry.name[:-len(suffix)])
+                        break
+        names = sorted(names)
+        if not names:
             print("No checkpoints found")
             return []
         
         print(f"\nAvailable checkpoints in {self.checkpoint_dir}:")
-        for cp in sorted(checkpoints):
-            print(f"  - {cp.stem}")
-        return [cp.stem for cp in checkpoints]
+        for name in names:
+            print(f"  - {name}")
+        return names
 
 def save_current_model_state(checkpoint_name="checkpoint_1"):
     """Save current model state from cell_model.py."""
@@ -98,9 +255,9 @@ def save_current_model_state(checkpoint_name="checkpoint_1"):
     
     # Extract all relevant parameters
     parameters = {
-        # OCV tables - access class attributes directly
-        'ocv_soc_table_discharge': LiFePO4Cell._OCV_SOC_TABLE_DISCHARGE.tolist(),
-        'ocv_soc_table_charge': LiFePO4Cell._OCV_SOC_TABLE_CHARGE.tolist(),
+        # OCV tables - access class attributes directly (the checkpoint serializer handles ndarrays)
+        'ocv_soc_table_discharge': LiFePO4Cell._OCV_SOC_TABLE_DISCHARGE,
+        'ocv_soc_table_charge': LiFePO4Cell._OCV_SOC_TABLE_CHARGE,
         
         # ECM parameters
         'R1': float(LiFePO4Cell.R1),
@@ -127,7 +284,7 @@ def save_current_model_state(checkpoint_name="checkpoint_1"):
         
         # Notes
         'notes': 'Checkpoint 1: Original model parameters before adjustments to match real data',
-        'timestamp': str(pd.Timestamp.now()) if 'pd' in dir() else None
+        'timestamp': datetime.now().isoformat()
     }
     
     # Save checkpoint
@@ -10,9 +10,27 @@ This module provides various current profile types for battery simulation:
 
 import numpy as np
 import yaml
-from typing import Optional, List, Dict, Union, Callable
+from typing import Optional, List, Dict, Union, Callable, IO
 from enum import Enum
 
+# libyaml's C loader when PyYAML was built with it (same safe subset, much faster)
+_YAML_SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+# Names available to dynamic profile expressions (shared, built once)
+_EXPRESSION_NAMESPACE = {
+    'np': np,
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'exp': np.exp,
+    'log': np.log,
+    'sqrt': np.sqrt,
+    'abs': np.abs,
+    'pi': np.pi,
+    'e': np.e
+}
+
 
 class ProfileType(Enum):
     """Current profile types."""
@@ -54,7 +72,7 @@ class CurrentProfile:
             **kwargs: Profile-specific parameters:
                 - constant: current_a (float)
                 - pulse: current_high_a, current_low_a, period_sec, duty_cycle (0-1)
-                - yaml: yaml_file (str) or yaml_data (dict)
+                - yaml: yaml_file (str), yaml_stream (str or file-like) or yaml_data (dict)
                 - dynamic: function (callable) or expression (str)
         """
         if isinstance(profile_type, str):
@@ -70,6 +88,9 @@ class CurrentProfile:
         # Initialize profile-specific data
         self._duration_sec = 0.0
         self._segments = []
+        self._seg_starts = np.empty(0)
+        self._seg_ends = np.empty(0)
+        self._seg_currents = np.empty(0)
         self._dynamic_function = None
         
         # Initialize based on profile type
@@ -122,14 +143,21 @@ class CurrentProfile:
         self._high_duration_sec = period_sec * duty_cycle
         self._low_duration_sec = period_sec * (1.0 - duty_cycle)
     
-    def _init_yaml(self, yaml_file: Optional[str] = None, yaml_data: Optional[Dict] = None):
-        """Initialize profile from YAML file or data."""
+    def _init_yaml(
+        self,
+        yaml_file: Optional[str] = None,
+        yaml_data: Optional[Dict] = None,
+        yaml_stream: Optional[Union[str, IO]] = None
+    ):
+        """Initialize profile from YAML file, stream/string or data."""
         if yaml_file is not None:
             with open(yaml_file, 'r') as f:
-                yaml_data = yaml.safe_load(f)
+                yaml_data = yaml.load(f, Loader=_YAML_SAFE_LOADER)
+        elif yaml_stream is not None:
+            yaml_data = yaml.load(yaml_stream, Loader=_YAML_SAFE_LOADER)
         
         if yaml_data is None:
-            raise ValueError("Either yaml_file or yaml_data must be provided")
+            raise ValueError("Either yaml_file, yaml_stream or yaml_data must be provided")
         
         # Extract profile data
         self._profile_name = yaml_data.get('name', 'Unnamed Profile')
@@ -152,6 +180,14 @@ class CurrentProfile:
         # Sort segments by start time
         self._segments.sort(key=lambda x: x['time_range'][0])
         
+        # Struct-of-arrays view of the sorted segments for O(log n) lookups
+        self._seg_starts = np.fromiter((seg['time_range'][0] for seg in self._segments),
+                                       dtype=np.float64, count=len(self._segments))
+        self._seg_ends = np.fromiter((seg['time_range'][1] for seg in self._segments),
+                                     dtype=np.float64, count=len(self._segments))
+        self._seg_currents = np.fromiter((seg['current_a'] for seg in self._segments),
+                                         dtype=np.float64, count=len(self._segments))
+        
         # Validate segments (no overlaps, continuous coverage)
         self._validate_segments()
     
@@ -174,29 +210,20 @@ class CurrentProfile:
         elif expression is not None:
             # Create function from expression
             # Expression can use: t (time), np (numpy), sin, cos, etc.
-            def make_function(expr):
-                def func(t):
-                    # Create safe namespace for evaluation
-                    namespace = {
-                        't': t,
-                        'np': np,
-                        'sin': np.sin,
-                        'cos': np.cos,
-                        'tan': np.tan,
-                        'exp': np.exp,
-                        'log': np.log,
-                        'sqrt': np.sqrt,
-                        'abs': np.abs,
-                        'pi': np.pi,
-                        'e': np.e
-                    }
-                    try:
-                        return float(eval(expr, namespace))
-                    except Exception as e:
-                        raise ValueError(f"Error evaluating expression '{expr}': {e}")
-                return func
+            # Compiled once; scalar t returns a float, array t returns an array
+            try:
+                code = compile(expression, '<profile>', 'eval')
+            except SyntaxError as e:
+                raise ValueError(f"Error evaluating expression '{expression}': {e}")
             
-            self._dynamic_function = make_function(expression)
+            def func(t):
+                try:
+                    value = eval(code, _EXPRESSION_NAMESPACE, {'t': t})
+                except Exception as e:
+                    raise ValueError(f"Error evaluating expression '{expression}': {e}")
+                return float(value) if np.ndim(value) == 0 else value
+            
+            self._dynamic_function = func
         else:
             raise ValueError("Either function or expression must be provided")
         
@@ -207,14 +234,15 @@ class CurrentProfile:
         if not self._segments:
             return
         
-        # Check for overlaps
-        for i in range(len(self._segments) - 1):
+        # Check for overlaps (segments are sorted by start time, so comparing
+        # each end with the next start in one array pass is sufficient)
+        overlaps = np.flatnonzero(self._seg_ends[:-1] > self._seg_starts[1:])
+        if overlaps.size:
+            i = int(overlaps[0])
             current_end = self._segments[i]['time_range'][1]
             next_start = self._segments[i + 1]['time_range'][0]
-            
-            if current_end > next_start:
-                raise ValueError(f"Segment overlap: segment {i} ends at {current_end}s, "
-                               f"segment {i+1} starts at {next_start}s")
+            raise ValueError(f"Segment overlap: segment {i} ends at {current_end}s, "
+                           f"segment {i+1} starts at {next_start}s")
     
     def get_current_at_time(self, t_sec: float) -> float:
         """
@@ -254,30 +282,27 @@ class CurrentProfile:
             return current_a * 1000.0  # Convert A to mA
         
         elif self._profile_type == ProfileType.YAML:
-            # Find segment containing this time
-            for i, seg in enumerate(self._segments):
-                t_start, t_end = seg['time_range']
+            # Find segment containing this time (segments are sorted and non-overlapping)
+            i = int(np.searchsorted(self._seg_starts, t_sec, side='right')) - 1
+            if i < 0 or t_sec >= self._seg_ends[i]:
+                # Time not in any segment
+                return 0.0
+            
+            current_a = float(self._seg_currents[i])
+            
+            # Apply smooth transition if enabled and not first/last segment
+            if self._smooth_transitions and i > 0:
+                prev_end = float(self._seg_ends[i - 1])
                 
-                if t_start <= t_sec < t_end:
-                    current_a = seg['current_a']
-                    
-                    # Apply smooth transition if enabled and not first/last segment
-                    if self._smooth_transitions and i > 0:
-                        prev_seg = self._segments[i - 1]
-                        prev_end = prev_seg['time_range'][1]
-                        
-                        # Check if we're in transition region
-                        if t_sec < prev_end + self._transition_duration_sec:
-                            # Linear ramp from previous to current
-                            transition_pos = (t_sec - prev_end) / self._transition_duration_sec
-                            transition_pos = np.clip(transition_pos, 0.0, 1.0)
-                            prev_current_a = prev_seg['current_a']
-                            current_a = prev_current_a * (1.0 - transition_pos) + current_a * transition_pos
-                    
-                    return current_a * 1000.0  # Convert A to mA
+                # Check if we're in transition region
+                if t_sec < prev_end + self._transition_duration_sec:
+                    # Linear ramp from previous to current
+                    transition_pos = (t_sec - prev_end) / self._transition_duration_sec
+                    transition_pos = min(max(transition_pos, 0.0), 1.0)
+                    prev_current_a = float(self._seg_currents[i - 1])
+                    current_a = prev_current_a * (1.0 - transition_pos) + current_a * transition_pos
             
-            # Time not in any segment
-            return 0.0
+            return current_a * 1000.0  # Convert A to mA
         
         elif self._profile_type == ProfileType.DYNAMIC:
             # Call dynamic function
@@ -296,6 +321,15 @@ class CurrentProfile:
         """
         self._init_yaml(yaml_file=yaml_file)
     
+    def load_from_yaml_stream(self, yaml_stream: Union[str, IO]):
+        """
+        Load profile from an in-memory YAML string or open text stream.
+        
+        Args:
+            yaml_stream: YAML document (str) or file-like object
+        """
+        self._init_yaml(yaml_stream=yaml_stream)
+    
     def get_duration(self) -> float:
         """
         Get total duration of profile.
@@ -341,16 +375,23 @@ class CurrentProfile:
         
         return info
     
-    def generate_time_series(self, dt_sec: float = 1.0, t_start: float = 0.0) -> tuple:
+    def generate_time_series(
+        self,
+        dt_sec: float = 1.0,
+        t_start: float = 0.0,
+        dtype: type = np.float64
+    ) -> tuple:
         """
         Generate time series of current values.
         
         Args:
             dt_sec: Time step in seconds
             t_start: Start time in seconds
+            dtype: dtype of the returned current array. np.float32 halves its size;
+                   rounding error is below 0.004 mA for currents up to 131 A
         
         Returns:
-            Tuple of (time_array, current_array_mA)
+            Tuple of (time_array, current_array_mA). time_array is always float64
         """
         if self._duration_sec == float('inf'):
             # For infinite profiles, generate up to a reasonable limit
@@ -358,8 +399,84 @@ class CurrentProfile:
         else:
             t_end = min(self._duration_sec, t_start + 3600.0)
         
+        # Times stay float64: float32 spacing is already ~8 ms at t = 24 h
         time_array = np.arange(t_start, t_end, dt_sec)
-        current_array = np.array([self.get_current_at_time(t) for t in time_array])
+        current_array = self.get_current_at_times(time_array).astype(dtype, copy=False)
         
         return time_array, current_array
+    
+    def get_current_at_times(self, time_array: np.ndarray) -> np.ndarray:
+        """
+        Get current for an array of times (vectorised get_current_at_time).
+        
+        Args:
+            time_array: Times in seconds
+        
+        Returns:
+            Array of currents in mA (milliamperes)
+        """
+        t = np.asarray(time_array, dtype=np.float64)
+        
+        if self._profile_type == ProfileType.CONSTANT:
+            current_ma = np.full(t.shape, self._current_a * 1000.0)
+        
+        elif self._profile_type == ProfileType.PULSE:
+            # Position in period for every sample
+            t_relative = (t + self._phase_sec) % self._period_sec
+            current_a = np.where(t_relative < self._high_duration_sec,
+                                 self._current_high_a, self._current_low_a)
+            
+            # Apply smooth transition if enabled
+            if self._smooth_transitions:
+                transition_width = min(self._transition_duration_sec, self._period_sec * 0.1)
+                in_transition = np.abs(t_relative - self._high_duration_sec) < transition_width / 2
+                transition_pos = (t_relative - (self._high_duration_sec - transition_width / 2)) / transition_width
+                ramp_a = self._current_high_a * (1.0 - transition_pos) + self._current_low_a * transition_pos
+                current_a = np.where(in_transition, ramp_a, current_a)
+            
+            current_ma = current_a * 1000.0
+        
+        elif self._profile_type == ProfileType.YAML:
+            if not self._segments:
+                return np.zeros(t.shape)
+            
+            starts = self._seg_starts
+            ends = self._seg_ends
+            currents = self._seg_currents
+            
+            # Segments are sorted and non-overlapping: the candidate is the last one starting at or before t
+            idx = np.searchsorted(starts, t, side='right') - 1
+            safe_idx = np.maximum(idx, 0)
+            in_segment = (idx >= 0) & (t < ends[safe_idx])
+            current_a = currents[safe_idx]
+            
+            # Apply smooth transition if enabled and not first segment
+            if self._smooth_transitions:
+                prev_idx = np.maximum(safe_idx - 1, 0)
+                prev_end = ends[prev_idx]
+                in_transition = (safe_idx > 0) & (t < prev_end + self._transition_duration_sec)
+                transition_pos = np.clip((t - prev_end) / self._transition_duration_sec, 0.0, 1.0)
+                ramp_a = currents[prev_idx] * (1.0 - transition_pos) + current_a * transition_pos
+                current_a = np.where(in_transition, ramp_a, current_a)
+            
+            # Time not in any segment
+            current_ma = np.where(in_segment, current_a * 1000.0, 0.0)
+        
+        elif self._profile_type == ProfileType.DYNAMIC:
+            # Most numpy-based callables broadcast; fall back to per-sample calls otherwise
+            try:
+                current_a = np.asarray(self._dynamic_function(t), dtype=np.float64)
+            except Exception:
+                current_a = None
+            if current_a is None or current_a.shape not in ((), t.shape):
+                current_a = np.fromiter(map(self._dynamic_function, t.ravel()),
+                                        dtype=np.float64, count=t.size).reshape(t.shape)
+            current_ma = np.broadcast_to(current_a * 1000.0, t.shape).copy()
+        
+        else:
+            return np.zeros(t.shape)
+        
+        # Return 0 after duration
+        current_ma[t > self._duration_sec] = 0.0
+        return current_ma
 
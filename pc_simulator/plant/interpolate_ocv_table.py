@@ -1,4 +1,5 @@
 """Interpolate OCV table values between key points to create smooth curve."""
+import sys
 import numpy as np
 
 # Key points from real data
@@ -13,39 +14,27 @@ key_points = {
     100: 3.472
 }
 
-# Create full table with interpolation
-soc_values = list(range(101))
-ocv_values = []
-
-for soc in soc_values:
-    if soc in key_points:
-        ocv_values.append(key_points[soc])
-    else:
-        # Find surrounding key points
-        lower_soc = max([k for k in key_points.keys() if k <= soc])
-        upper_soc = min([k for k in key_points.keys() if k >= soc])
-        
-        if lower_soc == upper_soc:
-            ocv_values.append(key_points[lower_soc])
-        else:
-            # Linear interpolation
-            lower_ocv = key_points[lower_soc]
-            upper_ocv = key_points[upper_soc]
-            ratio = (soc - lower_soc) / (upper_soc - lower_soc)
-            ocv = lower_ocv + ratio * (upper_ocv - lower_ocv)
-            ocv_values.append(round(ocv, 3))
+# Create full table with interpolation (single vectorised linear interpolant)
+# No explicit rounding: the :.3f formatting below already rounds correctly,
+# whereas np.round(..., 3) can disagree with round() on values near a half
+key_soc = np.array(sorted(key_points))
+key_ocv = np.array([key_points[k] for k in key_soc])
+soc_values = np.arange(101)
+ocv_values = np.interp(soc_values, key_soc, key_ocv)
 
 # Print in the format needed for cell_model.py
-print("_OCV_SOC_TABLE_DISCHARGE = np.array([")
-print("        # SOC%, OCV(V) - Interpolated from real data")
+lines = ["_OCV_SOC_TABLE_DISCHARGE = np.array([",
+         "        # SOC%, OCV(V) - Interpolated from real data"]
 for i, (soc, ocv) in enumerate(zip(soc_values, ocv_values)):
     if i == 0:
-        print(f"        [{soc:.1f}, {ocv:.3f}],   # {soc}% - fully discharged")
+        lines.append(f"        [{soc:.1f}, {ocv:.3f}],   # {soc}% - fully discharged")
     elif i == 100:
-        print(f"        [{soc:.1f}, {ocv:.3f}],  # {soc}% - fully charged")
+        lines.append(f"        [{soc:.1f}, {ocv:.3f}],  # {soc}% - fully charged")
     elif i % 10 == 0:
-        print(f"        [{soc:.1f}, {ocv:.3f}],  # {soc}%")
+        lines.append(f"        [{soc:.1f}, {ocv:.3f}],  # {soc}%")
     else:
-        print(f"        [{soc:.1f}, {ocv:.3f}],")
-print("    ])")
+        lines.append(f"        [{soc:.1f}, {ocv:.3f}],")
+lines.append("    ])")
 
+# Single write instead of one print() per row
+sys.stdout.write("\n".join(lines) + "\n")
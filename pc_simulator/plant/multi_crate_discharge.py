@@ -6,6 +6,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 # Add parent directory to path for imports
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -46,44 +47,52 @@ def run_discharge_simulation(
     discharge_current_a = -c_rate * capacity_ah
     discharge_current_ma = discharge_current_a * 1000.0
     
-    # Data storage
-    time_data = []
-    voltage_data = []
-    soc_data = []
-    ocv_data = []
+    # Safety limit (increase limit for low C-rates)
+    max_steps = 500000 if c_rate <= 1.0 else 200000
+    
+    # Data storage (preallocated; the loop can store max_steps + 1 samples)
+    time_buf = np.empty(max_steps + 1)
+    voltage_buf = np.empty(max_steps + 1)
+    soc_buf = np.empty(max_steps + 1)
+    ocv_buf = np.empty(max_steps + 1)
     
     step = 0
     elapsed_time = 0.0
     
+    # Bind loop invariants to locals (avoids attribute lookups per step)
+    update = cell.update
+    dt_sec = dt_ms / 1000.0
+    
     # Run simulation until target SOC is reached
     while cell._soc > target_soc:
         # Update cell
-        voltage_mv, soc_pct = cell.update(
+        voltage_mv, soc_pct = update(
             current_ma=discharge_current_ma,
             dt_ms=dt_ms,
             ambient_temp_c=temperature_c
         )
         
         # Store data
-        elapsed_time += dt_ms / 1000.0
-        time_data.append(elapsed_time)
-        voltage_data.append(voltage_mv / 1000.0)  # Convert to V
-        soc_data.append(soc_pct)
-        ocv_data.append(cell.get_ocv(current_direction=-1))  # Discharge OCV
+        elapsed_time += dt_sec
+        time_buf[step] = elapsed_time
+        voltage_buf[step] = voltage_mv / 1000.0  # Convert to V
+        soc_buf[step] = soc_pct
+        ocv_buf[step] = cell.last_ocv_v  # Discharge OCV already computed by update()
         
         step += 1
         
-        # Safety check (increase limit for low C-rates)
-        max_steps = 500000 if c_rate <= 1.0 else 200000
+        # Safety check
         if step > max_steps:
             print(f"WARNING: Maximum steps reached for {c_rate}C discharge")
             break
     
+    # Copy the trimmed views so the results do not pin the full buffers
     return {
-        'time': np.array(time_data),
-        'voltage': np.array(voltage_data),
-        'soc': np.array(soc_data),
-        'ocv': np.array(ocv_data),
+        'time': time_buf[:step].copy(),
+        'voltage': voltage_buf[:step].copy(),
+        'soc': soc_buf[:step].copy(),
+        'ocv': ocv_buf[:step].copy(),
+        'dt_sec': dt_sec,
         'c_rate': c_rate
     }
 
@@ -113,18 +122,26 @@ def plot_multi_crate_comparison():
     print(f"C-rates: {c_rates}")
     print("=" * 80)
     
-    # Run simulations for each C-rate
-    results = {}
+    # Run simulations for each C-rate (independent and CPU-bound, so one process each)
+    print(f"\nRunning {', '.join(f'{c_rate}C' for c_rate in c_rates)} discharge simulations in parallel...")
+    with ProcessPoolExecutor(max_workers=len(c_rates)) as executor:
+        futures = {
+            c_rate: executor.submit(
+                run_discharge_simulation,
+                capacity_ah=capacity_ah,
+                initial_soc=initial_soc,
+                target_soc=target_soc,
+                c_rate=c_rate,
+                temperature_c=temperature_c,
+                dt_ms=dt_ms
+            )
+            for c_rate in c_rates
+        }
+        results = {c_rate: future.result() for c_rate, future in futures.items()}
+    
+    # Report in C-rate order regardless of completion order
     for c_rate in c_rates:
-        print(f"\nRunning {c_rate}C discharge simulation...")
-        results[c_rate] = run_discharge_simulation(
-            capacity_ah=capacity_ah,
-            initial_soc=initial_soc,
-            target_soc=target_soc,
-            c_rate=c_rate,
-            temperature_c=temperature_c,
-            dt_ms=dt_ms
-        )
+        print(f"\n{c_rate}C discharge simulation:")
         print(f"  Completed: {len(results[c_rate]['time'])} steps, "
               f"Duration: {results[c_rate]['time'][-1]:.1f}s, "
               f"Final Voltage: {results[c_rate]['voltage'][-1]:.3f}V")
@@ -181,8 +198,10 @@ def plot_multi_crate_comparison():
         print(f"  Initial Voltage: {result['voltage'][0]:.3f}V")
         print(f"  Final Voltage: {result['voltage'][-1]:.3f}V")
         print(f"  Voltage Drop: {result['voltage'][0] - result['voltage'][-1]:.3f}V")
-        # Calculate energy using trapezoidal integration
-        energy_wh = np.trapezoid(result['voltage'], result['time']) * abs(c_rate * capacity_ah) / 3600
+        # Calculate energy using trapezoidal integration (uniform step: one reduction, no diff pass)
+        voltage = result['voltage']
+        voltage_integral = (voltage.sum() - 0.5 * (voltage[0] + voltage[-1])) * result['dt_sec']
+        energy_wh = voltage_integral * abs(c_rate * capacity_ah) / 3600
         print(f"  Energy Discharged: {energy_wh:.2f} Wh")
     print("=" * 80)
     
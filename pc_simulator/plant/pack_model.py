@@ -6,7 +6,7 @@ Includes cell-to-cell variations, thermal coupling, and fault injection capabili
 """
 
 import numpy as np
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 from plant.cell_model import LiFePO4Cell
 
 
@@ -28,7 +28,7 @@ class BatteryPack16S:
         capacity_variation_sigma: Capacity mismatch standard deviation (default: 1.5%)
         soc_variation_sigma: Initial SOC variation standard deviation (default: 2%)
         resistance_variation: Internal resistance variation range (default: ±10%)
-        thermal_coupling_coeff: Thermal coupling coefficient between cells (default: 0.1)
+        thermal_coupling_coeff: Thermal coupling coefficient between cells (default: 0.2)
         soc_calculation_mode: 'average' or 'minimum' for pack SOC (default: 'minimum')
     """
     
@@ -42,7 +42,7 @@ class BatteryPack16S:
         capacity_variation_sigma: float = 0.4,  # Reduced from 1.5% to match real data (~6.8mV spread)
         soc_variation_sigma: float = 0.25,  # Reduced from 2.0% to match real data
         resistance_variation: float = 0.025,  # Reduced from 0.1 (10%) to 0.025 (2.5%) to match real data
-        thermal_coupling_coeff: float = 0.1,
+        thermal_coupling_coeff: float = 0.2,  # Was 0.1 applied twice per cell pair; same coupling strength
         soc_calculation_mode: str = 'minimum',
         seed: Optional[int] = None
     ):
@@ -64,6 +64,8 @@ class BatteryPack16S:
         self._ambient_temp_c = ambient_temp_c
         self._thermal_coupling_coeff = thermal_coupling_coeff
         self._soc_calculation_mode = soc_calculation_mode
+        # Pack SOC reducer, bound once ('average' -> mean, anything else -> minimum)
+        self._soc_reducer = np.mean if soc_calculation_mode == 'average' else np.min
         
         # Set random seed for reproducibility
         if seed is not None:
@@ -90,8 +92,8 @@ class BatteryPack16S:
             self.NUM_CELLS
         )
         
-        # Create 16 cells with variations
-        self._cells = []
+        # Create 16 cells with variations (frozen into a tuple once built)
+        cells = []
         self._capacity_multipliers = capacity_variations
         self._resistance_multipliers = resistance_variations
         
@@ -102,14 +104,18 @@ class BatteryPack16S:
                 temperature_c=ambient_temp_c,
                 resistance_multiplier=resistance_variations[i]
             )
-            self._cells.append(cell)
+            cells.append(cell)
+        self._cells = tuple(cells)
         
         # Store original resistance multipliers for aging updates
         self._base_resistance_multipliers = resistance_variations.copy()
         
         # Fault injection state
-        self._fault_voltages = np.full(self.NUM_CELLS, None, dtype=object)  # None or forced voltage in mV
-        self._fault_temperatures = np.full(self.NUM_CELLS, None, dtype=object)  # None or forced temp in °C
+        # Boolean mask per cell plus the forced value (only meaningful where the mask is set)
+        self._fault_v_mask = np.zeros(self.NUM_CELLS, dtype=bool)
+        self._fault_v_mv = np.zeros(self.NUM_CELLS)  # Forced voltage in mV
+        self._fault_t_mask = np.zeros(self.NUM_CELLS, dtype=bool)
+        self._fault_t_c = np.zeros(self.NUM_CELLS)  # Forced temperature in °C
         self._fault_state = {}  # Pack-level fault state
         
         # Track pack current (same for all cells in series)
@@ -118,6 +124,52 @@ class BatteryPack16S:
         # Statistics
         self._total_energy_ah = 0.0
         self._cycles = 0
+        
+        # Struct-of-arrays per-cell state owned by the pack (index = cell position).
+        # The cells still run the ECM (faults, hysteresis, aging); these arrays
+        # are refreshed once per update() and serve all getters and coupling.
+        self._soc = np.empty(self.NUM_CELLS)  # fraction 0-1
+        self._temperature_c = np.empty(self.NUM_CELLS)
+        self._voltage_mv = np.empty(self.NUM_CELLS)  # cell voltage as reported by get_state()
+        self._direction = np.zeros(self.NUM_CELLS, dtype=np.int8)  # last current direction per cell
+        self._ocv_temp_coeff = self._cells[0].params.ocv_temp_coeff  # shared by all pack cells
+        # Inputs of the last OCV lookup (NaN = nothing cached yet)
+        self._ocv_key_soc = np.full(self.NUM_CELLS, np.nan)
+        self._ocv_key_temp = np.full(self.NUM_CELLS, np.nan)
+        self._ocv_key_dir = np.zeros(self.NUM_CELLS, dtype=np.int8)
+        # Reused output buffers for internal consumers that only derive scalars
+        # or lists from the per-cell arrays (public getters still return copies)
+        self._buf_v = np.empty(self.NUM_CELLS)
+        self._buf_t = np.empty(self.NUM_CELLS)
+        self._buf_s = np.empty(self.NUM_CELLS)
+        self._sync_cell_state()
+    
+    def _sync_cell_state(self):
+        """Refresh the per-cell state arrays from the cell objects."""
+        soc = self._soc
+        temps = self._temperature_c
+        directions = self._direction
+        for i, cell in enumerate(self._cells):
+            soc[i] = cell._soc
+            temps[i] = cell._temperature_c
+            directions[i] = cell._last_current_direction
+        self._sample_cell_voltages()
+    
+    def _sample_cell_voltages(self):
+        """Evaluate all cell voltages (OCV, as in get_state()) in one batched lookup."""
+        # Skip the lookup when no cell's inputs changed (e.g. pack at rest);
+        # exact comparison so the cached voltages are identical to a fresh lookup
+        if (np.array_equal(self._soc, self._ocv_key_soc)
+                and np.array_equal(self._temperature_c, self._ocv_key_temp)
+                and np.array_equal(self._direction, self._ocv_key_dir)):
+            return
+        self._ocv_key_soc[:] = self._soc
+        self._ocv_key_temp[:] = self._temperature_c
+        self._ocv_key_dir[:] = self._direction
+        
+        self._voltage_mv[:] = LiFePO4Cell.get_ocv_batch(
+            self._soc, self._temperature_c, self._direction, self._ocv_temp_coeff
+        ) * 1000.0
     
     def update(
         self,
@@ -139,32 +191,80 @@ class BatteryPack16S:
         # Store pack current (same for all cells in series)
         self._pack_current_ma = current_ma
         
-        # Get current cell temperatures (before update)
-        current_temps = np.array([cell._temperature_c for cell in self._cells])
-        
         # Update each cell
+        soc_arr = self._soc
+        temp_arr = self._temperature_c
+        dir_arr = self._direction
+        fault_t_mask = self._fault_t_mask
         for i, cell in enumerate(self._cells):
             # Check for fault injection
-            forced_temp = self._fault_temperatures[i]
-            temp_to_use = forced_temp if forced_temp is not None else None
+            temp_to_use = self._fault_t_c[i] if fault_t_mask[i] else None
             
-            # Update cell
-            voltage, soc = cell.update(
+            # Update cell (fault voltages are a read-side overlay applied in
+            # get_cell_voltages(), so nothing to do for them here)
+            cell.update(
                 current_ma=current_ma,
                 dt_ms=dt_ms,
                 temperature_c=temp_to_use,
                 ambient_temp_c=self._ambient_temp_c
             )
             
-            # Apply fault voltage if set
-            if self._fault_voltages[i] is not None:
-                # Override cell voltage (for fault injection)
-                pass  # Voltage will be returned from get_cell_voltages()
+            soc_arr[i] = cell._soc
+            temp_arr[i] = cell._temperature_c
+            dir_arr[i] = cell._last_current_direction
         
         # Apply thermal coupling between adjacent cells
-        self._apply_thermal_coupling(current_temps, dt_ms)
+        self._apply_thermal_coupling(dt_ms)
+        
+        # Cell voltages depend on the coupled temperature, so sample them last
+        self._sample_cell_voltages()
+    
+    def update_batch(
+        self,
+        currents_ma: np.ndarray,
+        dt_ms: float,
+        ambient_temp_c: Optional[Union[float, np.ndarray]] = None,
+        pack_soc_out: Optional[np.ndarray] = None,
+        pack_voltage_out: Optional[np.ndarray] = None,
+        cell_voltages_out: Optional[np.ndarray] = None,
+        cell_temperatures_out: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Advance the pack by one step per entry of currents_ma.
+        
+        Same result as calling update() once per current. Optionally records
+        the state after each step into caller-provided arrays (row k = after
+        step k), so long runs need one Python-level call per batch.
+        
+        Args:
+            currents_ma: Pack current per step in mA (positive = charge)
+            dt_ms: Time step in milliseconds
+            ambient_temp_c: Ambient temperature in °C (optional); a scalar for all
+                steps or an array[N] with one value per step (e.g. a replayed profile)
+            pack_soc_out: Optional array[N] for get_pack_soc()
+            pack_voltage_out: Optional array[N] for get_pack_voltage()
+            cell_voltages_out: Optional array[N, 16] for get_cell_voltages()
+            cell_temperatures_out: Optional array[N, 16] for get_cell_temperatures()
+        """
+        update = self.update
+        # Python floats: the cell state must not turn into numpy scalars
+        currents = np.asarray(currents_ma, dtype=np.float64)
+        if np.ndim(ambient_temp_c) > 0:
+            ambients = np.broadcast_to(np.asarray(ambient_temp_c, dtype=np.float64), currents.shape).tolist()
+        else:
+            ambients = [ambient_temp_c] * currents.size
+        for k, (current_ma, ambient_c) in enumerate(zip(currents.tolist(), ambients)):
+            update(current_ma, dt_ms, ambient_c)
+            if pack_soc_out is not None:
+                pack_soc_out[k] = self.get_pack_soc()
+            if pack_voltage_out is not None:
+                pack_voltage_out[k] = self.get_pack_voltage()
+            if cell_voltages_out is not None:
+                cell_voltages_out[k] = self._fill_cell_voltages()
+            if cell_temperatures_out is not None:
+                cell_temperatures_out[k] = self._fill_cell_temperatures()
     
-    def _apply_thermal_coupling(self, previous_temps: np.ndarray, dt_ms: float):
+    def _apply_thermal_coupling(self, dt_ms: float):
         """
         Apply thermal coupling between adjacent cells.
         
@@ -172,28 +272,17 @@ class BatteryPack16S:
         temperature difference.
         
         Args:
-            previous_temps: Previous cell temperatures
             dt_ms: Time step in milliseconds
         """
-        current_temps = np.array([cell._temperature_c for cell in self._cells])
-        temp_diffs = current_temps - previous_temps
+        current_temps = self._temperature_c
         
         # Thermal coupling: adjacent cells exchange heat
         # Heat flow: Q = k * (T_i - T_j) where k is coupling coefficient
+        # One flow per adjacent pair (edge): leaves cell i, enters cell i+1
+        pair_flow = self._thermal_coupling_coeff * (current_temps[:-1] - current_temps[1:])
         coupling_energy = np.zeros(self.NUM_CELLS)
-        
-        for i in range(self.NUM_CELLS):
-            # Couple with left neighbor
-            if i > 0:
-                temp_diff = current_temps[i] - current_temps[i-1]
-                coupling_energy[i] -= self._thermal_coupling_coeff * temp_diff
-                coupling_energy[i-1] += self._thermal_coupling_coeff * temp_diff
-            
-            # Couple with right neighbor
-            if i < self.NUM_CELLS - 1:
-                temp_diff = current_temps[i] - current_temps[i+1]
-                coupling_energy[i] -= self._thermal_coupling_coeff * temp_diff
-                coupling_energy[i+1] += self._thermal_coupling_coeff * temp_diff
+        coupling_energy[1:] += pair_flow
+        coupling_energy[:-1] -= pair_flow
         
         # Apply thermal coupling (simplified: direct temperature adjustment)
         # Convert energy to temperature change: dT = Q / C_thermal
@@ -201,11 +290,14 @@ class BatteryPack16S:
         thermal_mass = LiFePO4Cell.THERMAL_MASS
         dt_sec = dt_ms / 1000.0
         
-        for i, cell in enumerate(self._cells):
-            if self._fault_temperatures[i] is None:  # Don't override fault temperatures
-                temp_change = (coupling_energy[i] * dt_sec) / thermal_mass
-                cell._temperature_c += temp_change
-                cell._temperature_c = np.clip(cell._temperature_c, -40.0, 85.0)
+        temp_change = (coupling_energy * dt_sec) / thermal_mass
+        new_temps = np.clip(current_temps + temp_change, -40.0, 85.0)
+        
+        # Don't override fault temperatures
+        free = ~self._fault_t_mask
+        current_temps[free] = new_temps[free]
+        for i in np.flatnonzero(free):
+            self._cells[i]._temperature_c = float(current_temps[i])
     
     def get_cell_voltages(self) -> np.ndarray:
         """
@@ -214,18 +306,8 @@ class BatteryPack16S:
         Returns:
             numpy array[16] of cell voltages in mV
         """
-        voltages = np.zeros(self.NUM_CELLS)
-        
-        for i, cell in enumerate(self._cells):
-            if self._fault_voltages[i] is not None:
-                # Return fault-injected voltage
-                voltages[i] = self._fault_voltages[i]
-            else:
-                # Get actual cell voltage
-                state = cell.get_state()
-                voltages[i] = state['voltage_mv']
-        
-        return voltages
+        # Fault-injected voltage where set, actual cell voltage otherwise
+        return np.where(self._fault_v_mask, self._fault_v_mv, self._voltage_mv)
     
     def get_cell_temperatures(self) -> np.ndarray:
         """
@@ -234,16 +316,8 @@ class BatteryPack16S:
         Returns:
             numpy array[16] of cell temperatures in °C
         """
-        temps = np.zeros(self.NUM_CELLS)
-        
-        for i, cell in enumerate(self._cells):
-            if self._fault_temperatures[i] is not None:
-                # Return fault-injected temperature
-                temps[i] = self._fault_temperatures[i]
-            else:
-                temps[i] = cell._temperature_c
-        
-        return temps
+        # Fault-injected temperature where set, actual cell temperature otherwise
+        return np.where(self._fault_t_mask, self._fault_t_c, self._temperature_c)
     
     def get_cell_socs(self) -> np.ndarray:
         """
@@ -252,8 +326,25 @@ class BatteryPack16S:
         Returns:
             numpy array[16] of cell SOCs in percent (0-100)
         """
-        socs = np.array([cell._soc * 100.0 for cell in self._cells])
-        return socs
+        return self._soc * 100.0
+    
+    def _fill_cell_voltages(self) -> np.ndarray:
+        """Same values as get_cell_voltages(), written into a reused buffer."""
+        buf = self._buf_v
+        np.copyto(buf, self._voltage_mv)
+        np.copyto(buf, self._fault_v_mv, where=self._fault_v_mask)
+        return buf
+    
+    def _fill_cell_temperatures(self) -> np.ndarray:
+        """Same values as get_cell_temperatures(), written into a reused buffer."""
+        buf = self._buf_t
+        np.copyto(buf, self._temperature_c)
+        np.copyto(buf, self._fault_t_c, where=self._fault_t_mask)
+        return buf
+    
+    def _fill_cell_socs(self) -> np.ndarray:
+        """Same values as get_cell_socs(), written into a reused buffer."""
+        return np.multiply(self._soc, 100.0, out=self._buf_s)
     
     def get_pack_voltage(self) -> float:
         """
@@ -262,7 +353,7 @@ class BatteryPack16S:
         Returns:
             Pack voltage in mV (sum of all cell voltages)
         """
-        cell_voltages = self.get_cell_voltages()
+        cell_voltages = self._fill_cell_voltages()
         return np.sum(cell_voltages)
     
     def get_pack_current(self) -> float:
@@ -283,15 +374,12 @@ class BatteryPack16S:
         Returns:
             Pack SOC in percent (0-100)
         """
-        cell_socs = self.get_cell_socs()
-        
-        if self._soc_calculation_mode == 'minimum':
-            return np.min(cell_socs)
-        elif self._soc_calculation_mode == 'average':
-            return np.mean(cell_socs)
-        else:
-            # Default to minimum
-            return np.min(cell_socs)
+        # Reduce the internal 0-1 fractions and scale only the scalar result
+        return self._pack_soc_from(self._soc) * 100.0
+    
+    def _pack_soc_from(self, cell_socs: np.ndarray) -> float:
+        """Pack SOC from already computed cell SOCs (same unit as the input)."""
+        return self._soc_reducer(cell_socs)
     
     def set_cell_voltage(self, cell_index: int, voltage_mv: Optional[float]):
         """
@@ -304,7 +392,9 @@ class BatteryPack16S:
         if cell_index < 0 or cell_index >= self.NUM_CELLS:
             raise ValueError(f"Cell index must be 0-{self.NUM_CELLS-1}")
         
-        self._fault_voltages[cell_index] = voltage_mv
+        self._fault_v_mask[cell_index] = voltage_mv is not None
+        if voltage_mv is not None:
+            self._fault_v_mv[cell_index] = voltage_mv
     
     def set_cell_temperature(self, cell_index: int, temperature_c: Optional[float]):
         """
@@ -317,12 +407,14 @@ class BatteryPack16S:
         if cell_index < 0 or cell_index >= self.NUM_CELLS:
             raise ValueError(f"Cell index must be 0-{self.NUM_CELLS-1}")
         
-        self._fault_temperatures[cell_index] = temperature_c
+        self._fault_t_mask[cell_index] = temperature_c is not None
+        if temperature_c is not None:
+            self._fault_t_c[cell_index] = temperature_c
     
     def clear_all_faults(self):
         """Clear all fault injections."""
-        self._fault_voltages.fill(None)
-        self._fault_temperatures.fill(None)
+        self._fault_v_mask.fill(False)
+        self._fault_t_mask.fill(False)
     
     def get_cell_imbalance(self) -> dict:
         """
@@ -337,18 +429,25 @@ class BatteryPack16S:
             - max_soc_pct: Maximum cell SOC
             - soc_delta_pct: SOC difference (max - min)
         """
-        voltages = self.get_cell_voltages()
-        socs = self.get_cell_socs()
-        
+        return self._imbalance_from(self._fill_cell_voltages(), self._fill_cell_socs())
+    
+    @staticmethod
+    def _imbalance_from(voltages: np.ndarray, socs: np.ndarray) -> dict:
+        """Imbalance statistics (see get_cell_imbalance) from already computed arrays."""
+        # One reduction per statistic (arrays are tiny, so call overhead dominates)
+        v_min = voltages.min()
+        v_max = voltages.max()
+        s_min = socs.min()
+        s_max = socs.max()
         return {
-            'min_voltage_mv': np.min(voltages),
-            'max_voltage_mv': np.max(voltages),
-            'voltage_delta_mv': np.max(voltages) - np.min(voltages),
-            'min_soc_pct': np.min(socs),
-            'max_soc_pct': np.max(socs),
-            'soc_delta_pct': np.max(socs) - np.min(socs),
-            'voltage_std_mv': np.std(voltages),
-            'soc_std_pct': np.std(socs)
+            'min_voltage_mv': v_min,
+            'max_voltage_mv': v_max,
+            'voltage_delta_mv': v_max - v_min,
+            'min_soc_pct': s_min,
+            'max_soc_pct': s_max,
+            'soc_delta_pct': s_max - s_min,
+            'voltage_std_mv': voltages.std(),
+            'soc_std_pct': socs.std()
         }
     
     def set_aging(self, cycles: int):
@@ -361,6 +460,7 @@ class BatteryPack16S:
         for cell in self._cells:
             cell.set_aging(cycles)
         self._cycles = cycles
+        self._sync_cell_state()
     
     def get_pack_state(self) -> dict:
         """
@@ -369,15 +469,16 @@ class BatteryPack16S:
         Returns:
             Dictionary with pack state information
         """
-        cell_voltages = self.get_cell_voltages()
-        cell_temps = self.get_cell_temperatures()
-        cell_socs = self.get_cell_socs()
-        imbalance = self.get_cell_imbalance()
+        # Compute each per-cell array once and derive everything else from it
+        cell_voltages = self._fill_cell_voltages()
+        cell_temps = self._fill_cell_temperatures()
+        cell_socs = self._fill_cell_socs()
+        imbalance = self._imbalance_from(cell_voltages, cell_socs)
         
         return {
-            'pack_voltage_mv': self.get_pack_voltage(),
-            'pack_current_ma': self.get_pack_current(),
-            'pack_soc_pct': self.get_pack_soc(),
+            'pack_voltage_mv': np.sum(cell_voltages),
+            'pack_current_ma': self._pack_current_ma,
+            'pack_soc_pct': self._pack_soc_from(cell_socs),
             'cell_voltages_mv': cell_voltages.tolist(),
             'cell_temperatures_c': cell_temps.tolist(),
             'cell_socs_pct': cell_socs.tolist(),
@@ -386,6 +487,33 @@ class BatteryPack16S:
             'cycles': self._cycles
         }
     
+    def get_pack_state_arrays(self) -> dict:
+        """
+        Get complete pack state with per-cell values as numpy arrays.
+        
+        Same keys as get_pack_state(), but the cell_* entries are arrays[16]
+        instead of lists, for consumers that stay in numpy (plotting, npz/CSV
+        logging). The arrays are fresh and safe to keep across updates.
+        
+        Returns:
+            Dictionary with pack state information
+        """
+        cell_voltages = self.get_cell_voltages()
+        cell_temps = self.get_cell_temperatures()
+        cell_socs = self.get_cell_socs()
+        
+        return {
+            'pack_voltage_mv': np.sum(cell_voltages),
+            'pack_current_ma': self._pack_current_ma,
+            'pack_soc_pct': self._pack_soc_from(cell_socs),
+            'cell_voltages_mv': cell_voltages,
+            'cell_temperatures_c': cell_temps,
+            'cell_socs_pct': cell_socs,
+            'imbalance': self._imbalance_from(cell_voltages, cell_socs),
+            'ambient_temp_c': self._ambient_temp_c,
+            'cycles': self._cycles
+        }
+    
     def reset(self, soc_pct: Optional[float] = None, temperature_c: Optional[float] = None):
         """
         Reset pack state (useful for testing).
@@ -404,4 +532,5 @@ class BatteryPack16S:
         
         self.clear_all_faults()
         self._pack_current_ma = 0.0
+        self._sync_cell_state()
 
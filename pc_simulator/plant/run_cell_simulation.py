@@ -5,17 +5,28 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
 import argparse
+import math
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
 from pathlib import Path
 
 from sil_bms.pc_simulator.plant.pack_model import BatteryPack16S
 
+# Samples buffered per block before they are scaled and written to the CSV
+CSV_BLOCK_ROWS = 65536
+
+# CSV columns: pack series, then all 16 cell voltages and temperatures
+CSV_COLUMNS = (
+    ('time_s', 'soc_percent', 'pack_voltage_V', 'pack_current_A')
+    + tuple(f'cell_{i+1}_V' for i in range(BatteryPack16S.NUM_CELLS))
+    + tuple(f'cell_{i+1}_temp_C' for i in range(BatteryPack16S.NUM_CELLS))
+)
+CSV_HEADER = ','.join(CSV_COLUMNS) + '\n'
+
 def run_simulation(mode='discharge', current_amp=1.0, duration_sec=None, target_soc_pct=None,
                    initial_soc_pct=100.0, dt_ms=100.0, 
-                   temperature_c=25.0, save_plot=False, plot_filename=None, save_csv=True, csv_filename=None):
+                   temperature_c=25.0, save_plot=False, plot_filename=None, save_csv=True, csv_filename=None,
+                   keep_history=True):
     """
     Run pack charge/discharge simulation with real-time stepping.
     
@@ -31,7 +42,16 @@ def run_simulation(mode='discharge', current_amp=1.0, duration_sec=None, target_
         plot_filename: Filename for plot (auto-generated if None)
         save_csv: Whether to save CSV data (default: True)
         csv_filename: Filename for CSV (auto-generated if None)
+        keep_history: Keep all samples in memory and return them (default: True).
+            If False, samples are only streamed to the CSV block by block (constant
+            memory for long runs) and None is returned; requires save_csv, no save_plot.
+    
+    Returns:
+        Dictionary of sample arrays, or None if keep_history is False
     """
+    if not keep_history and (save_plot or not save_csv):
+        raise ValueError("keep_history=False streams samples to the CSV only (needs save_csv, no save_plot)")
+    
     capacity_ah = 100.0  # Fixed capacity per cell
     
     # Determine current direction
@@ -77,122 +97,193 @@ def run_simulation(mode='discharge', current_amp=1.0, duration_sec=None, target_
         ambient_temp_c=temperature_c
     )
     
-    # Data storage
-    time_data = []
-    soc_data = []
-    pack_voltage_data = []
-    pack_current_data = []
-    cell_voltages_data = []  # Will store all 16 cell voltages
-    cell_temperatures_data = []  # Will store all 16 cell temperatures
+    # Samples are buffered raw in fixed-size blocks. Each full block is scaled to V,
+    # appended to the CSV and (if keep_history) rounded and kept.
+    n_cells = BatteryPack16S.NUM_CELLS
+    block_rows = min(max_steps, CSV_BLOCK_ROWS)
+    soc_buf = np.empty(block_rows)
+    pack_voltage_buf = np.empty(block_rows)  # mV
+    cell_voltages_buf = np.empty((block_rows, n_cells))  # mV
+    cell_temperatures_buf = np.empty((block_rows, n_cells))
+    blocks = []
     
-    step = 0
-    elapsed_time = 0.0
+    # Current as recorded in the data (constant for the whole run)
+    if duration_sec is not None:
+        recorded_current_a = current_amp if mode == 'charge' else -current_amp
+    else:
+        recorded_current_a = -current_amp if mode == 'discharge' else current_amp
+    recorded_current_a = round(recorded_current_a, 6)
     
-    print(f"\nStarting simulation (real-time at {dt_ms}ms intervals)...")
+    csv_file = None
+    if save_csv:
+        # Create output directory if it doesn't exist
+        output_dir = Path(__file__).parent / "output"
+        output_dir.mkdir(exist_ok=True)
+        
+        if csv_filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            csv_filename = f"pack_{mode}_{current_amp}A_{timestamp}.csv"
+        
+        # Ensure filename doesn't have path separators
+        csv_filename = Path(csv_filename).name
+        csv_path = output_dir / csv_filename
+        
+        # Rows are appended block by block while the simulation runs
+        # (closed in the finally below, also on errors or Ctrl+C)
+        csv_file = open(csv_path, 'w')
     
-    initial_pack_state = pack.get_pack_state()
-    initial_soc = initial_pack_state['pack_soc_pct']
-    initial_voltage = initial_pack_state['pack_voltage_mv'] / 1000.0
+    def flush_block(first_step, rows):
+        """Scale the first `rows` buffered samples to output units, then write and/or keep them."""
+        # Step k reports elapsed time k * dt
+        times = np.arange(first_step, first_step + rows) * dt_ms / 1000.0
+        # mV -> V in place: the buffers are refilled from row 0 after each flush
+        pack_v = pack_voltage_buf[:rows]
+        cell_v = cell_voltages_buf[:rows]
+        np.divide(pack_v, 1000.0, out=pack_v)
+        np.divide(cell_v, 1000.0, out=cell_v)
+        block = np.column_stack((
+            times,
+            soc_buf[:rows],
+            pack_v,
+            np.full(rows, recorded_current_a),
+            cell_v,
+            cell_temperatures_buf[:rows]
+        ))
+        # Rounded to 6 decimal places exactly once: by the '%.6f' format in the
+        # CSV, and by np.round only for the history returned to the caller
+        if csv_file is not None:
+            np.savetxt(csv_file, block, fmt='%.6f', delimiter=',')
+        if keep_history:
+            np.round(block, 6, out=block)
+            blocks.append(block)
     
-    # Determine stopping condition
-    if duration_sec is not None:
-        # Real-time simulation: stop after exact duration
-        # For 1 minute at 100ms intervals, we need exactly 600 steps
-        target_time = duration_sec
-        while elapsed_time < target_time and step < max_steps:
-            # Update pack
-            pack.update(
-                current_ma=current_ma,
-                dt_ms=dt_ms,
-                ambient_temp_c=temperature_c
-            )
-            
-            # Increment time by exact dt_ms (no fast-forwarding)
-            # Use exact calculation to avoid floating point errors
-            elapsed_time = round(step * dt_ms / 1000.0, 6)
-            step += 1
-            
-            # Get pack state
-            pack_state = pack.get_pack_state()
-            
-            # Store data (round to 6 decimal places)
-            time_data.append(round(elapsed_time, 6))
-            soc_data.append(round(pack_state['pack_soc_pct'], 6))
-            pack_voltage_data.append(round(pack_state['pack_voltage_mv'] / 1000.0, 6))
-            pack_current_data.append(round(current_amp if mode == 'charge' else -current_amp, 6))
-            
-            # Store all 16 cell voltages (round to 6 decimal places)
-            cell_voltages = [round(v / 1000.0, 6) for v in pack_state['cell_voltages_mv']]
-            cell_voltages_data.append(cell_voltages)
-            
-            # Store all 16 cell temperatures (round to 6 decimal places)
-            cell_temps = [round(t, 6) for t in pack_state['cell_temperatures_c']]
-            cell_temperatures_data.append(cell_temps)
-            
-            # Progress update every 10 seconds
-            if step % int(10.0 / (dt_ms / 1000.0)) == 0:
-                print(f"  Time: {elapsed_time:6.1f}s | SOC: {pack_state['pack_soc_pct']:6.2f}% | Pack Voltage: {pack_state['pack_voltage_mv']/1000:.3f}V")
-    else:
-        # Stop at target SOC
-        target_soc = target_soc_pct
-        if mode == 'discharge':
-            while pack.get_pack_soc() > target_soc and step < max_steps:
-                pack.update(
-                    current_ma=current_ma,
-                    dt_ms=dt_ms,
-                    ambient_temp_c=temperature_c
-                )
-                
-                elapsed_time = round(step * dt_ms / 1000.0, 6)
-                step += 1
-                
-                pack_state = pack.get_pack_state()
-                
-                # Store data (round to 6 decimal places)
-                time_data.append(round(elapsed_time, 6))
-                soc_data.append(round(pack_state['pack_soc_pct'], 6))
-                pack_voltage_data.append(round(pack_state['pack_voltage_mv'] / 1000.0, 6))
-                pack_current_data.append(round(-current_amp, 6))
-                
-                cell_voltages = [round(v / 1000.0, 6) for v in pack_state['cell_voltages_mv']]
-                cell_voltages_data.append(cell_voltages)
-                
-                cell_temps = [round(t, 6) for t in pack_state['cell_temperatures_c']]
-                cell_temperatures_data.append(cell_temps)
+    try:
+        if csv_file is not None:
+            csv_file.write(CSV_HEADER)
+        
+        step = 0
+        row = 0  # index into the current block
+        
+        print(f"\nStarting simulation (real-time at {dt_ms}ms intervals)...")
+        
+        initial_pack_state = pack.get_pack_state()
+        initial_soc = initial_pack_state['pack_soc_pct']
+        initial_voltage = initial_pack_state['pack_voltage_mv'] / 1000.0
+        
+        # Loop invariants, bound once (progress print every 10 s of simulated time)
+        dt_sec = dt_ms / 1000.0
+        progress_interval = max(1, int(10.0 / dt_sec))
+        pack_update = pack.update
+        get_pack_soc = pack.get_pack_soc
+        get_pack_voltage = pack.get_pack_voltage
+        get_cell_voltages = pack.get_cell_voltages
+        get_cell_temperatures = pack.get_cell_temperatures
+        
+        # Determine stopping condition
+        if duration_sec is not None:
+            # Real-time simulation: stop after exact duration
+            # For 1 minute at 100ms intervals, we need exactly 600 steps
+            # Step k reports round(k * dt, 6); run up to and including the first step
+            # whose reported time reaches the duration (capped at max_steps)
+            target_time = duration_sec
+            if target_time > 0:
+                # Find the first such step from the analytic estimate, correcting it
+                # by single steps (no per-step time array: constant memory)
+                def reported_time(k):
+                    return np.round(k * dt_ms / 1000.0, 6)
                 
-                if step % int(10.0 / (dt_ms / 1000.0)) == 0:
-                    print(f"  Time: {elapsed_time:6.1f}s | SOC: {pack_state['pack_soc_pct']:6.2f}% | Pack Voltage: {pack_state['pack_voltage_mv']/1000:.3f}V")
-        else:  # charge
-            while pack.get_pack_soc() < target_soc and step < max_steps:
-                pack.update(
-                    current_ma=current_ma,
-                    dt_ms=dt_ms,
-                    ambient_temp_c=temperature_c
+                first = min(max(math.ceil(duration_sec * 1000 / dt_ms), 0), max_steps)
+                while first > 0 and reported_time(first - 1) >= target_time:
+                    first -= 1
+                while first < max_steps and reported_time(first) < target_time:
+                    first += 1
+                num_steps = min(first + 1, max_steps)
+            else:
+                num_steps = 0
+            # Step count is known, so advance in batches that end at the next
+            # progress print, block boundary or the last step (whichever is first)
+            while step < num_steps:
+                n = min(progress_interval - step % progress_interval, block_rows - row, num_steps - step)
+                pack.update_batch(
+                    np.full(n, current_ma),
+                    dt_ms,
+                    ambient_temp_c=temperature_c,
+                    pack_soc_out=soc_buf[row:row + n],
+                    pack_voltage_out=pack_voltage_buf[row:row + n],
+                    cell_voltages_out=cell_voltages_buf[row:row + n],
+                    cell_temperatures_out=cell_temperatures_buf[row:row + n]
                 )
+                step += n
+                row += n
+                soc_pct = soc_buf[row - 1]
+                pack_voltage_mv = pack_voltage_buf[row - 1]
+                if row == block_rows:
+                    flush_block(step - row, row)
+                    row = 0
                 
-                elapsed_time = round(step * dt_ms / 1000.0, 6)
-                step += 1
-                
-                pack_state = pack.get_pack_state()
-                
-                # Store data (round to 6 decimal places)
-                time_data.append(round(elapsed_time, 6))
-                soc_data.append(round(pack_state['pack_soc_pct'], 6))
-                pack_voltage_data.append(round(pack_state['pack_voltage_mv'] / 1000.0, 6))
-                pack_current_data.append(round(current_amp, 6))
-                
-                cell_voltages = [round(v / 1000.0, 6) for v in pack_state['cell_voltages_mv']]
-                cell_voltages_data.append(cell_voltages)
-                
-                cell_temps = [round(t, 6) for t in pack_state['cell_temperatures_c']]
-                cell_temperatures_data.append(cell_temps)
-                
-                if step % int(10.0 / (dt_ms / 1000.0)) == 0:
-                    print(f"  Time: {elapsed_time:6.1f}s | SOC: {pack_state['pack_soc_pct']:6.2f}% | Pack Voltage: {pack_state['pack_voltage_mv']/1000:.3f}V")
+                # Progress update every 10 seconds
+                if step % progress_interval == 0:
+                    print(f"  Time: {(step - 1) * dt_sec:6.1f}s | SOC: {soc_pct:6.2f}% | Pack Voltage: {pack_voltage_mv/1000:.3f}V")
+        else:
+            # Stop at target SOC
+            target_soc = target_soc_pct
+            if mode == 'discharge':
+                while pack.get_pack_soc() > target_soc and step < max_steps:
+                    pack_update(
+                        current_ma=current_ma,
+                        dt_ms=dt_ms,
+                        ambient_temp_c=temperature_c
+                    )
+                    
+                    step += 1
+                    
+                    # Store data (direct getters; no per-step state dict)
+                    soc_pct = soc_buf[row] = get_pack_soc()
+                    pack_voltage_mv = pack_voltage_buf[row] = get_pack_voltage()
+                    cell_voltages_buf[row] = get_cell_voltages()
+                    cell_temperatures_buf[row] = get_cell_temperatures()
+                    row += 1
+                    if row == block_rows:
+                        flush_block(step - row, row)
+                        row = 0
+                    
+                    if step % progress_interval == 0:
+                        print(f"  Time: {(step - 1) * dt_sec:6.1f}s | SOC: {soc_pct:6.2f}% | Pack Voltage: {pack_voltage_mv/1000:.3f}V")
+            else:  # charge
+                while pack.get_pack_soc() < target_soc and step < max_steps:
+                    pack_update(
+                        current_ma=current_ma,
+                        dt_ms=dt_ms,
+                        ambient_temp_c=temperature_c
+                    )
+                    
+                    step += 1
+                    
+                    # Store data (direct getters; no per-step state dict)
+                    soc_pct = soc_buf[row] = get_pack_soc()
+                    pack_voltage_mv = pack_voltage_buf[row] = get_pack_voltage()
+                    cell_voltages_buf[row] = get_cell_voltages()
+                    cell_temperatures_buf[row] = get_cell_temperatures()
+                    row += 1
+                    if row == block_rows:
+                        flush_block(step - row, row)
+                        row = 0
+                    
+                    if step % progress_interval == 0:
+                        print(f"  Time: {(step - 1) * dt_sec:6.1f}s | SOC: {soc_pct:6.2f}% | Pack Voltage: {pack_voltage_mv/1000:.3f}V")
+        
+        # Flush the last (partial) block
+        if row:
+            flush_block(step - row, row)
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+    
+    elapsed_time = round((step - 1) * dt_ms / 1000.0, 6) if step else 0.0
     
     final_pack_state = pack.get_pack_state()
     final_soc = final_pack_state['pack_soc_pct']
-    final_voltage = pack_voltage_data[-1]
+    final_voltage = final_pack_state['pack_voltage_mv'] / 1000.0
     
     print(f"\nSimulation completed:")
     print(f"  Steps: {step}")
@@ -204,51 +295,25 @@ def run_simulation(mode='discharge', current_amp=1.0, duration_sec=None, target_
     print(f"  Final Pack Voltage: {final_voltage:.3f}V")
     print(f"  Voltage Change: {abs(initial_voltage - final_voltage):.3f}V")
     
-    # Prepare data dictionary
+    if save_csv:
+        print(f"\nCSV data saved to: {csv_path}")
+        print(f"  Total rows: {step}")
+        print(f"  Columns: {len(CSV_COLUMNS)} (time, soc, pack_voltage, pack_current, 16 cell voltages, 16 cell temperatures)")
+    
+    if not keep_history:
+        return None
+    
+    # Prepare data dictionary (one contiguous array per series)
+    table = np.concatenate(blocks) if blocks else np.empty((0, len(CSV_COLUMNS)))
     data = {
-        'time': np.array(time_data),
-        'soc': np.array(soc_data),
-        'pack_voltage': np.array(pack_voltage_data),
-        'pack_current': np.array(pack_current_data),
-        'cell_voltages': np.array(cell_voltages_data),  # Shape: (n_steps, 16)
-        'cell_temperatures': np.array(cell_temperatures_data)  # Shape: (n_steps, 16)
+        'time': table[:, 0].copy(),
+        'soc': table[:, 1].copy(),
+        'pack_voltage': table[:, 2].copy(),
+        'pack_current': table[:, 3].copy(),
+        'cell_voltages': table[:, 4:4 + n_cells].copy(),  # Shape: (n_steps, 16)
+        'cell_temperatures': table[:, 4 + n_cells:].copy()  # Shape: (n_steps, 16)
     }
     
-    # Save CSV data
-    if save_csv:
-        # Create output directory if it doesn't exist
-        output_dir = Path(__file__).parent / "output"
-        output_dir.mkdir(exist_ok=True)
-        
-        if csv_filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            csv_filename = f"pack_{mode}_{current_amp}A_{timestamp}.csv"
-        
-        # Ensure filename doesn't have path separators
-        csv_filename = Path(csv_filename).name
-        csv_path = output_dir / csv_filename
-        
-        # Create DataFrame with all cell voltages
-        df_dict = {
-            'time_s': np.round(data['time'], 6),
-            'soc_percent': np.round(data['soc'], 6),
-            'pack_voltage_V': np.round(data['pack_voltage'], 6),
-            'pack_current_A': np.round(data['pack_current'], 6),
-        }
-        
-        # Add all 16 cell voltages
-        for i in range(16):
-            df_dict[f'cell_{i+1}_V'] = np.round(data['cell_voltages'][:, i], 6)
-        
-        # Add all 16 cell temperatures
-        for i in range(16):
-            df_dict[f'cell_{i+1}_temp_C'] = np.round(data['cell_temperatures'][:, i], 6)
-        
-        df = pd.DataFrame(df_dict)
-        df.to_csv(csv_path, index=False, float_format='%.6f')
-        print(f"\nCSV data saved to: {csv_path}")
-        print(f"  Total rows: {len(df)}")
-        print(f"  Columns: {len(df.columns)} (time, soc, pack_voltage, pack_current, 16 cell voltages, 16 cell temperatures)")
     
     # Generate plot
     if save_plot:
@@ -258,6 +323,9 @@ def run_simulation(mode='discharge', current_amp=1.0, duration_sec=None, target_
 
 def plot_results(data, mode='discharge', current_amp=1.0, plot_filename=None):
     """Plot simulation results."""
+    # Imported here so runs without --plot do not pay matplotlib's import cost
+    import matplotlib.pyplot as plt
+    
     print("\nGenerating plots...")
     
     # Create output directory if it doesn't exist
@@ -310,7 +378,7 @@ def plot_results(data, mode='discharge', current_amp=1.0, plot_filename=None):
     
     # 4. Cell Voltage Spread
     ax4 = axes[1, 1]
-    cell_spread = data['cell_voltages'].max(axis=1) - data['cell_voltages'].min(axis=1)
+    cell_spread = np.ptp(data['cell_voltages'], axis=1)
     ax4.plot(data['time'], cell_spread * 1000, 'r-', linewidth=2, label='Cell Spread', alpha=0.9)
     ax4.set_xlabel('Time (s)', fontsize=12)
     ax4.set_ylabel('Cell Voltage Spread (mV)', fontsize=12)
@@ -389,7 +457,8 @@ Examples:
         save_plot=args.plot,
         plot_filename=args.plot_filename,
         save_csv=not args.no_csv,
-        csv_filename=args.csv_filename
+        csv_filename=args.csv_filename,
+        keep_history=args.plot or args.no_csv  # CSV-only runs stream rows instead
     )
     
     print("\nSimulation complete!")
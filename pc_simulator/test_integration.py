@@ -5,14 +5,6 @@ Quick test script to verify integration and print sample data.
 import sys
 import os
 
-# Add parent directory to path so we can import sil_bms
-parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-if parent_dir not in sys.path:
-    sys.path.insert(0, parent_dir)
-
-import sys
-import os
-
 # Add parent directory to path so we can import sil_bms
 # File is at: sil_bms/pc_simulator/test_integration.py
 # We need: C:\Work\T_appl in path
@@ -27,6 +19,7 @@ import time
 from sil_bms.pc_simulator.plant.pack_model import BatteryPack16S
 from sil_bms.pc_simulator.afe.wrapper import AFEWrapper
 from sil_bms.pc_simulator.communication.uart_tx import UARTTransmitter
+from sil_bms.pc_simulator.communication.protocol import AFEMeasFrame
 
 
 def print_frame_data(frame_data: dict, sequence: int):
@@ -104,6 +97,7 @@ def main():
     
     current_ma = 50000.0  # 50A charge
     dt_ms = 20.0  # 20ms = 50Hz
+    encode_frame = AFEMeasFrame.encode
     
     for frame_num in range(3):
         # Update pack
@@ -134,8 +128,7 @@ def main():
         print_frame_data(frame_data, frame_num)
         
         # Show what would be sent via UART
-        from sil_bms.pc_simulator.communication.protocol import AFEMeasFrame
-        frame_bytes = AFEMeasFrame.encode(
+        frame_bytes = encode_frame(
             frame_data['timestamp_ms'],
             frame_data['vcell_mv'],
             frame_data['tcell_cc'],
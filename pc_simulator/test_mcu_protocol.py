@@ -21,7 +21,8 @@ from sil_bms.pc_simulator.communication.protocol_mcu import (
     SIL_FRAME_FOOTER,
     SIL_FRAME_VERSION,
     SIL_FRAME_OVERHEAD,
-    crc16_ccitt_be
+    crc16_ccitt_be,
+    decode_cell_voltages
 )
 
 
@@ -69,7 +70,7 @@ def test_mcu_frame_format():
     # Check length
     length_msb = frame[2]
     length_lsb = frame[3]
-    data_length = (length_msb << 8) | length_lsb
+    data_length = int.from_bytes(frame[2:4], 'big')
     print(f"[OK] Data length: {data_length} bytes (MSB: 0x{length_msb:02X}, LSB: 0x{length_lsb:02X})")
     
     # Extract data payload
@@ -81,7 +82,7 @@ def test_mcu_frame_format():
     crc_start = data_end
     crc_msb = frame[crc_start]
     crc_lsb = frame[crc_start + 1]
-    received_crc = (crc_msb << 8) | crc_lsb
+    received_crc = int.from_bytes(frame[crc_start:crc_start + 2], 'big')
     
     calculated_crc = crc16_ccitt_be(data_payload, 0xFFFF)
     assert received_crc == calculated_crc, f"CRC mismatch: got 0x{received_crc:04X}, expected 0x{calculated_crc:04X}"
@@ -137,7 +138,7 @@ def test_data_layout():
     )
     
     # Extract data payload
-    data_length = (frame[2] << 8) | frame[3]
+    data_length = int.from_bytes(frame[2:4], 'big')
     data_payload = frame[4:4+data_length]
     
     print(f"\nData payload size: {len(data_payload)} bytes")
@@ -153,17 +154,13 @@ def test_data_layout():
     print(f"  9. Pack values: 3 + 3×1 strings = 6 values × 4 bytes = 24 bytes")
     print(f"  10. Digital inputs: ~100+ bytes")
     
-    # Verify first cell voltage (big-endian)
-    offset = 0
-    first_cell_msb = data_payload[offset]
-    first_cell_lsb = data_payload[offset + 1]
-    first_cell_value = (first_cell_msb << 8) | first_cell_lsb
-    expected_first = vcell_mv[0]
-    
-    print(f"\nFirst cell voltage:")
-    print(f"  Bytes: 0x{first_cell_msb:02X} 0x{first_cell_lsb:02X}")
-    print(f"  Value: {first_cell_value} mV (expected: {expected_first} mV)")
-    assert first_cell_value == expected_first, f"First cell voltage mismatch"
+    # Verify all cell voltages (big-endian int16, decoded in one pass)
+    decoded_vcells = decode_cell_voltages(frame)
+    
+    print(f"\nCell voltages:")
+    print(f"  First cell bytes: 0x{data_payload[0]:02X} 0x{data_payload[1]:02X}")
+    print(f"  Values: {decoded_vcells.tolist()} mV")
+    np.testing.assert_array_equal(decoded_vcells, vcell_mv, err_msg="Cell voltage mismatch")
     print(f"  [OK] Correct")
     
     print("\n" + "=" * 80)
@@ -45,8 +45,8 @@ print("\n[3/5] Testing Frame Encoding...")
 try:
     import numpy as np
     encoder = SILFrameEncoder()
-    vcell = np.array([3250] * 16, dtype=np.uint16)
-    tcell = np.array([250] * 16, dtype=np.int16)
+    vcell = np.full(16, 3250, dtype=np.uint16)
+    tcell = np.full(16, 250, dtype=np.int16)
     frame = encoder.encode_frame(vcell, tcell, 50000, 52000, 0, 0)
     
     # Verify frame structure
@@ -353,6 +353,40 @@ class TestAFEWrapper:
         assert measured_v[5] != wrapper.INVALID_VOLTAGE_MV
         assert not (flags & (1 << 5))
 
+    def test_apply_measurement_batch_matches_sequential(self):
+        """Test that a batch matches the same frames measured one at a time."""
+        rng = np.random.default_rng(7)
+        true_voltages = 3200.0 + rng.normal(0.0, 50.0, (20, 16))
+        true_temps = 25.0 + rng.normal(0.0, 1.0, (20, 16))
+        true_currents = rng.normal(0.0, 10000.0, 20)
+
+        # Both wrappers seed the global stream, so run them one after the other
+        wrapper = AFEWrapper(seed=42)
+        wrapper.inject_fault(FaultType.OPEN_WIRE, cell_mask=1 << 2)
+        wrapper.inject_fault(FaultType.STUCK_ADC, cell_mask=1 << 4)
+        sequential = [
+            wrapper.apply_measurement(true_voltages[k], true_temps[k], true_currents[k])
+            for k in range(20)
+        ]
+
+        batch_wrapper = AFEWrapper(seed=42)
+        batch_wrapper.inject_fault(FaultType.OPEN_WIRE, cell_mask=1 << 2)
+        batch_wrapper.inject_fault(FaultType.STUCK_ADC, cell_mask=1 << 4)
+        measured_v, measured_t, measured_i, flags = batch_wrapper.apply_measurement_batch(
+            true_voltages, true_temps, true_currents
+        )
+
+        assert measured_v.shape == (20, 16)
+        assert measured_t.dtype == np.int16
+        np.testing.assert_array_equal(measured_v, [frame[0] for frame in sequential])
+        np.testing.assert_array_equal(measured_t, [frame[1] for frame in sequential])
+        np.testing.assert_array_equal(measured_i, [frame[2] for frame in sequential])
+        np.testing.assert_array_equal(flags, [frame[3] for frame in sequential])
+        assert batch_wrapper.get_statistics() == wrapper.get_statistics()
+
+        with pytest.raises(ValueError):
+            batch_wrapper.apply_measurement_batch(true_voltages[:, :8], true_temps, true_currents)
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -106,6 +106,27 @@ class TestLiFePO4Cell:
         assert 0.5 <= r0_0 <= 0.65, f"R0 at 0°C should be ~0.56mΩ, got {r0_0}mΩ"
         assert 0.35 <= r0_50 <= 0.5, f"R0 at 50°C should be ~0.44mΩ, got {r0_50}mΩ"
     
+    def test_soc_array_matches_scalar(self):
+        """Test batched (SOC array) OCV and R0 lookups match per-point scalar calls."""
+        soc_points = np.array([0.0, 5.0, 10.0, 20.0, 37.5, 50.0, 62.5, 80.0, 90.0, 99.0, 100.0])
+        
+        for direction in (None, 1, -1):
+            cell = LiFePO4Cell(temperature_c=25.0)
+            for temperature_c in (None, 0.0, 45.0):
+                ocv = cell.get_ocv(soc_pct=soc_points, temperature_c=temperature_c,
+                                   current_direction=direction)
+                r0 = cell.get_internal_resistance(soc_pct=soc_points, temperature_c=temperature_c)
+                
+                assert ocv.shape == soc_points.shape
+                assert r0.shape == soc_points.shape
+                for k, soc_pct in enumerate(soc_points.tolist()):
+                    assert ocv[k] == pytest.approx(
+                        cell.get_ocv(soc_pct=soc_pct, temperature_c=temperature_c,
+                                     current_direction=direction), abs=1e-12)
+                    assert r0[k] == pytest.approx(
+                        cell.get_internal_resistance(soc_pct=soc_pct, temperature_c=temperature_c),
+                        abs=1e-12)
+    
     def test_aging_capacity_fade(self):
         """Test capacity fade with aging."""
         cell = LiFePO4Cell(capacity_ah=100.0, cycles=0)
@@ -312,7 +333,42 @@ class TestLiFePO4Cell:
         assert state['soc_pct'] == 60.0
         assert state['temperature_c'] == 30.0
         assert state['cycles'] == 500
-
+    
+    def test_populate_state(self):
+        """Test populate_state() reuses the caller's dict."""
+        cell = LiFePO4Cell(capacity_ah=100.0, initial_soc=0.6, temperature_c=30.0, cycles=500)
+        
+        out = {}
+        result = cell.populate_state(out)
+        
+        assert result is out
+        assert out == cell.get_state()
+        
+        cell.update(-50000, 1000)
+        cell.populate_state(out)
+        
+        assert out['soc_pct'] == cell.soc_pct
+        assert out['temperature_c'] == cell.temperature_c
+        assert out['rc1_voltage_v'] == cell.rc1_voltage_v
+        assert out['voltage_mv'] == cell.voltage_mv
+    
+    def test_update_keeps_python_floats(self):
+        """Test update() state and return values stay Python floats (never numpy scalars)."""
+        cell = LiFePO4Cell(capacity_ah=100.0, initial_soc=0.5, temperature_c=25.0)
+        
+        # Charge, high C-rate discharge (RC cache miss), rest and forced temperature
+        for current_ma, dt_ms, temperature_c in ((50000, 100, None), (-300000, 100, None),
+                                                 (-300000, 1000, None), (0.0, 1000, None),
+                                                 (20000, 100, np.float64(30.0))):
+            voltage_mv, soc_pct = cell.update(current_ma, dt_ms, temperature_c=temperature_c)
+            
+            assert type(voltage_mv) is float
+            assert type(soc_pct) is float
+            assert type(cell._soc) is float
+            assert type(cell._v_rc1) is float
+            assert type(cell._v_rc2) is float
+            assert type(cell._temperature_c) is float
+        
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,86 @@
+"""
+Unit tests for the model checkpoint manager.
+"""
+
+import json
+import math
+import numpy as np
+from sil_bms.pc_simulator.plant.checkpoint_manager import ModelCheckpoint
+
+
+class TestModelCheckpoint:
+    """Test suite for ModelCheckpoint class."""
+    
+    def test_resave_in_other_format_loads_latest(self, tmp_path):
+        """Test re-saving a checkpoint in another format replaces the old file."""
+        mgr = ModelCheckpoint(checkpoint_dir=tmp_path)
+        
+        mgr.save_checkpoint('x', {'R1': 1.0, 'table': np.array([1.0, 2.0])})
+        mgr.save_checkpoint('x', {'R1': 2.0, 'table': np.array([3.0, 4.0])}, binary=False)
+        
+        assert not (tmp_path / 'x.npz').exists()
+        parameters = mgr.load_checkpoint('x')
+        assert parameters['R1'] == 2.0
+        np.testing.assert_array_equal(parameters['table'], [3.0, 4.0])
+    
+    def test_resave_compressed_json_loads_latest(self, tmp_path):
+        """Test re-saving plain JSON as .json.gz (and back to .npz) replaces the old file."""
+        mgr = ModelCheckpoint(checkpoint_dir=tmp_path)
+        
+        mgr.save_checkpoint('y', {'R1': 1.0, 'table': np.array([1.0, 2.0])}, binary=False)
+        mgr.save_checkpoint('y', {'R1': 2.0, 'table': np.array([3.0, 4.0])}, binary=False, compress=True)
+        
+        assert not (tmp_path / 'y.json').exists()
+        parameters = mgr.load_checkpoint('y')
+        assert parameters['R1'] == 2.0
+        np.testing.assert_array_equal(parameters['table'], [3.0, 4.0])
+        
+        mgr.save_checkpoint('y', {'R1': 3.0, 'table': np.array([5.0, 6.0])}, compress=True)
+        
+        assert not (tmp_path / 'y.json.gz').exists()
+        parameters = mgr.load_checkpoint('y')
+        assert parameters['R1'] == 3.0
+        np.testing.assert_array_equal(parameters['table'], [5.0, 6.0])
+        assert mgr.list_checkpoints() == ['y']
+    
+    def test_non_finite_values_round_trip(self, tmp_path):
+        """Test NaN/inf survive a save/load round trip in every format."""
+        mgr = ModelCheckpoint(checkpoint_dir=tmp_path)
+        parameters = {
+            'R1': float('nan'),
+            'C1': np.float64('inf'),
+            'cycles': np.int64(3),
+            'table': np.array([1.0, np.nan, -np.inf])
+        }
+        
+        for options in ({}, {'binary': False}, {'binary': False, 'compress': True}):
+            mgr.save_checkpoint('z', parameters, **options)
+            loaded = mgr.load_checkpoint('z')
+            
+            assert math.isnan(loaded['R1'])
+            assert loaded['C1'] == float('inf')
+            assert loaded['cycles'] == 3
+            np.testing.assert_array_equal(loaded['table'], [1.0, np.nan, -np.inf])
+    
+    def test_json_writers_agree(self, tmp_path):
+        """Test JSON checkpoints store numpy scalars the same way with finite and non-finite data."""
+        mgr = ModelCheckpoint(checkpoint_dir=tmp_path)
+        
+        mgr.save_checkpoint('a', {'cycles': np.int64(3), 'table': np.array([1.0, 2.0])}, binary=False)
+        mgr.save_checkpoint('b', {'cycles': np.int64(3), 'table': np.array([1.0, np.nan])}, binary=False)
+        
+        # numpy integer scalars are stored as floats by both writers
+        assert type(mgr.load_checkpoint('a')['cycles']) is float
+        assert type(mgr.load_checkpoint('b')['cycles']) is float
+    
+    def test_load_stdlib_json_with_nan_tokens(self, tmp_path):
+        """Test legacy checkpoints with NaN/Infinity tokens load (also when orjson is installed)."""
+        (tmp_path / 'legacy.json').write_text(
+            json.dumps({'R1': float('nan'), 'ocv_soc_table_charge': [[0.0, float('inf')]]})
+        )
+        mgr = ModelCheckpoint(checkpoint_dir=tmp_path)
+        
+        loaded = mgr.load_checkpoint('legacy')
+        
+        assert math.isnan(loaded['R1'])
+        np.testing.assert_array_equal(loaded['ocv_soc_table_charge'], [[0.0, np.inf]])
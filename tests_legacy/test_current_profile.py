@@ -4,6 +4,7 @@ Unit tests for Current Profile Generator.
 
 import pytest
 import numpy as np
+import io
 import tempfile
 import os
 from sil_bms.pc_simulator.plant.current_profile import CurrentProfile, ProfileType
@@ -151,30 +152,23 @@ segments:
     current_a: -100
 """
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write(yaml_content)
-            yaml_file = f.name
+        profile = CurrentProfile(
+            'yaml',
+            yaml_stream=io.StringIO(yaml_content),
+            smooth_transitions=True,
+            transition_duration_sec=10.0
+        )
+        
+        # Before transition
+        assert abs(profile.get_current_at_time(1790.0) - 50000.0) < 1000
+        
+        # During transition (should interpolate)
+        current_transition = profile.get_current_at_time(1805.0)
+        assert -100000.0 < current_transition < 50000.0
+        
+        # After transition
+        assert abs(profile.get_current_at_time(1810.0) - (-100000.0)) < 1000
         
-        try:
-            profile = CurrentProfile(
-                'yaml',
-                yaml_file=yaml_file,
-                smooth_transitions=True,
-                transition_duration_sec=10.0
-            )
-            
-            # Before transition
-            assert abs(profile.get_current_at_time(1790.0) - 50000.0) < 1000
-            
-            # During transition (should interpolate)
-            current_transition = profile.get_current_at_time(1805.0)
-            assert -100000.0 < current_transition < 50000.0
-            
-            # After transition
-            assert abs(profile.get_current_at_time(1810.0) - (-100000.0)) < 1000
-            
-        finally:
-            os.unlink(yaml_file)
     
     def test_dynamic_profile_function(self):
         """Test dynamic profile with function."""
@@ -257,6 +251,35 @@ segments:
         assert len(time_array) == len(current_array)
         assert len(time_array) == 100  # 100 seconds / 1 second step
         assert np.allclose(current_array, 50000.0)  # All should be 50A = 50000mA
+        
+        # Opt-in float32 current array
+        _, current_array_f32 = profile.generate_time_series(dt_sec=1.0, dtype=np.float32)
+        assert current_array_f32.dtype == np.float32
+        assert np.allclose(current_array_f32, 50000.0, rtol=1e-5)
+    
+    def test_generate_time_series_matches_scalar(self):
+        """Test vectorised generate_time_series() matches get_current_at_time()."""
+        yaml_data = {
+            'duration_sec': 60.0,
+            'segments': [
+                {'time_range': [0.0, 20.0], 'current_a': 50.0},
+                {'time_range': [20.0, 40.0], 'current_a': -25.0},
+                {'time_range': [45.0, 60.0], 'current_a': 10.0}
+            ]
+        }
+        profiles = [
+            CurrentProfile('pulse', current_high_a=100.0, current_low_a=-20.0, period_sec=7.0,
+                           duty_cycle=0.3, phase_sec=1.5, smooth_transitions=True,
+                           transition_duration_sec=2.0),
+            CurrentProfile('yaml', yaml_data=yaml_data, smooth_transitions=True,
+                           transition_duration_sec=3.0),
+            CurrentProfile('dynamic', function=lambda t: 10.0 if t < 5.0 else -10.0, duration_sec=30.0)
+        ]
+        
+        for profile in profiles:
+            time_array, current_array = profile.generate_time_series(dt_sec=0.25)
+            expected = np.array([profile.get_current_at_time(t) for t in time_array])
+            assert np.array_equal(current_array, expected)
     
     def test_pulse_smooth_transitions(self):
         """Test pulse profile with smooth transitions."""
@@ -290,21 +313,14 @@ segments:
     current_a: 100
 """
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write(yaml_content)
-            yaml_file = f.name
+        profile = CurrentProfile('yaml', yaml_stream=io.StringIO(yaml_content))
+        
+        # Test each segment
+        assert profile.get_current_at_time(150.0) == 25000.0
+        assert profile.get_current_at_time(450.0) == 50000.0
+        assert profile.get_current_at_time(750.0) == 75000.0
+        assert profile.get_current_at_time(1350.0) == 100000.0
         
-        try:
-            profile = CurrentProfile('yaml', yaml_file=yaml_file)
-            
-            # Test each segment
-            assert profile.get_current_at_time(150.0) == 25000.0
-            assert profile.get_current_at_time(450.0) == 50000.0
-            assert profile.get_current_at_time(750.0) == 75000.0
-            assert profile.get_current_at_time(1350.0) == 100000.0
-            
-        finally:
-            os.unlink(yaml_file)
     
     def test_yaml_profile_validation_overlap(self):
         """Test YAML profile validation (overlapping segments)."""
@@ -318,15 +334,8 @@ segments:
     current_a: -50
 """
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write(yaml_content)
-            yaml_file = f.name
-        
-        try:
-            with pytest.raises(ValueError, match="overlap"):
-                profile = CurrentProfile('yaml', yaml_file=yaml_file)
-        finally:
-            os.unlink(yaml_file)
+        with pytest.raises(ValueError, match="overlap"):
+            profile = CurrentProfile('yaml', yaml_stream=io.StringIO(yaml_content))
     
     def test_load_from_yaml(self):
         """Test load_from_yaml() method."""
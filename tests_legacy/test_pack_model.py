@@ -369,6 +369,54 @@ class TestBatteryPack16S:
         assert len(state['cell_temperatures_c']) == 16
         assert len(state['cell_socs_pct']) == 16
     
+    def test_get_pack_state_arrays(self):
+        """Test get_pack_state_arrays() matches get_pack_state()."""
+        pack = BatteryPack16S(seed=42)
+        pack.update(-50000, 1000)
+        pack.set_cell_voltage(3, 2500.0)
+        
+        state = pack.get_pack_state()
+        arrays = pack.get_pack_state_arrays()
+        
+        assert arrays.keys() == state.keys()
+        assert isinstance(arrays['cell_voltages_mv'], np.ndarray)
+        assert arrays['cell_voltages_mv'].tolist() == state['cell_voltages_mv']
+        assert arrays['cell_temperatures_c'].tolist() == state['cell_temperatures_c']
+        assert arrays['cell_socs_pct'].tolist() == state['cell_socs_pct']
+        assert arrays['pack_voltage_mv'] == state['pack_voltage_mv']
+        assert arrays['imbalance'] == state['imbalance']
+    
+    def test_update_batch_matches_update(self):
+        """Test update_batch() gives the same states as repeated update() calls."""
+        pack_a = BatteryPack16S(seed=42)
+        pack_b = BatteryPack16S(seed=42)
+        currents = np.array([-50000.0, -50000.0, 0.0, 20000.0, 20000.0])
+        
+        socs = np.empty(len(currents))
+        voltages = np.empty((len(currents), 16))
+        pack_b.update_batch(currents, 100.0, pack_soc_out=socs, cell_voltages_out=voltages)
+        
+        for k, current in enumerate(currents):
+            pack_a.update(float(current), 100.0)
+            assert socs[k] == pack_a.get_pack_soc()
+            np.testing.assert_array_equal(voltages[k], pack_a.get_cell_voltages())
+        np.testing.assert_array_equal(pack_b.get_cell_temperatures(), pack_a.get_cell_temperatures())
+    
+    def test_update_batch_per_step_ambient(self):
+        """Test update_batch() with one ambient temperature per step."""
+        pack_a = BatteryPack16S(seed=42)
+        pack_b = BatteryPack16S(seed=42)
+        currents = np.full(4, -100000.0)
+        ambients = np.array([25.0, 30.0, 35.0, 40.0])
+        
+        temps = np.empty((len(currents), 16))
+        pack_b.update_batch(currents, 60000.0, ambient_temp_c=ambients, cell_temperatures_out=temps)
+        
+        for k, (current, ambient) in enumerate(zip(currents, ambients)):
+            pack_a.update(float(current), 60000.0, ambient_temp_c=float(ambient))
+            np.testing.assert_array_equal(temps[k], pack_a.get_cell_temperatures())
+        assert pack_b.get_pack_soc() == pack_a.get_pack_soc()
+    
     def test_reset(self):
         """Test pack reset."""
         pack = BatteryPack16S(initial_soc_pct=50.0, seed=42)